@@ -5,22 +5,23 @@ Uses Anthropic's Claude with actual Google Classroom access through LangGraph to
 """
 
 import os
-import sys
-import json
+import orjson
 import yaml
 import time
+import functools
+import uuid
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, List, Any, Annotated, TypedDict
-
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+from typing import Optional, Dict, List, Any, Annotated, AsyncIterator, TypedDict
 
 try:
     from langchain_anthropic import ChatAnthropic
     from langgraph.graph import StateGraph, START, END
     from langgraph.prebuilt import ToolNode
-    from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, BaseMessage
+    from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, BaseMessage, AIMessageChunk, trim_messages
     from langgraph.graph.message import add_messages
+    from langgraph.checkpoint.memory import MemorySaver
     
     # Import classroom tools
     from chatbot_module.tools.classroom_tool import get_courses, get_course_details, create_assignment, upload_material
@@ -31,17 +32,68 @@ except ImportError as e:
     ChatAnthropic = None
 
 
+# Approximate budget for the conversation replayed to the model each turn (tokens ~= characters / 4)
+CHAT_HISTORY_TOKEN_BUDGET = 4000
+
+# Conversation threads kept in memory per process; the least recently used are dropped
+CHAT_MAX_THREADS = 256
+
+
+def _approx_tokens(messages: List[BaseMessage]) -> int:
+    """Estimate the prompt tokens of messages from their length."""
+    chars = 0
+    for message in messages:
+        chars += len(str(message.content)) + len(str(getattr(message, "tool_calls", None) or ""))
+    return chars // 4
+
+
+class _BoundedMemorySaver(MemorySaver):
+    """MemorySaver that keeps only the max_threads most recently used conversation threads."""
+    
+    def __init__(self, max_threads: int):
+        super().__init__()
+        self.max_threads = max_threads
+        self._recent = OrderedDict()
+        self._recent_lock = threading.Lock()
+    
+    def put(self, config, checkpoint, metadata, new_versions):
+        # aput delegates here as well
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        with self._recent_lock:
+            self._recent[thread_id] = None
+            self._recent.move_to_end(thread_id)
+            evicted = []
+            while len(self._recent) > self.max_threads:
+                evicted.append(self._recent.popitem(last=False)[0])
+        for old_thread_id in evicted:
+            super().delete_thread(old_thread_id)
+        return result
+    
+    def delete_thread(self, thread_id: str) -> None:
+        with self._recent_lock:
+            self._recent.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+
 class State(TypedDict):
     """State for the LangGraph chatbot."""
     messages: Annotated[List[BaseMessage], add_messages]
+    tool_calls: int  # model turns that requested tools during the current message
 
 
 class ClaudeChatbot:
     """Educational chatbot using Anthropic's Claude with LangGraph tools."""
     
+    # Model and compiled graph shared by all instances, keyed by API key
+    _shared_models: Dict[str, Any] = {}
+    _shared_graphs: Dict[str, Any] = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(self):
         self.api_key = self._get_claude_api_key()
         self.conversation_history = []
+        self.session_id = uuid.uuid4().hex
         self.tools = [get_courses, get_course_details, create_assignment, upload_material]
         self.model = None
         self.graph = None
@@ -52,8 +104,10 @@ class ClaudeChatbot:
         self._initialize_model()
         self._build_graph()
     
-    def _get_config(self) -> Optional[Dict]:
-        """Load configuration from config.yml."""
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _get_config() -> Optional[Dict]:
+        """Load configuration from config.yml (parsed once per process)."""
         try:
             config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yml')
             with open(config_path, "r") as file:
@@ -77,17 +131,32 @@ class ClaudeChatbot:
         if not self.api_key:
             raise ValueError("No Claude API key found. Please set CLAUDE_API_KEY or add claude_api_chatbot_key to config.yml")
         
-        # Initialize Claude model with tool binding
-        self.model = ChatAnthropic(
-            model="claude-3-haiku-20240307",
-            api_key=self.api_key,
-            temperature=0.3
-        ).bind_tools(self.tools)
+        with ClaudeChatbot._shared_lock:
+            model = ClaudeChatbot._shared_models.get(self.api_key)
+            if model is None:
+                # Initialize Claude model with tool binding
+                model = ChatAnthropic(
+                    model="claude-3-haiku-20240307",
+                    api_key=self.api_key,
+                    temperature=0.3
+                ).bind_tools(self.tools)
+                ClaudeChatbot._shared_models[self.api_key] = model
+                print("✓ Claude model with LangGraph tools initialized")
         
-        print("✓ Claude model with LangGraph tools initialized")
+        self.model = model
     
     def _build_graph(self):
-        """Build the LangGraph workflow."""
+        """Build the LangGraph workflow, reusing the shared compiled graph if available."""
+        with ClaudeChatbot._shared_lock:
+            graph = ClaudeChatbot._shared_graphs.get(self.api_key)
+            if graph is None:
+                graph = self._compile_graph()
+                ClaudeChatbot._shared_graphs[self.api_key] = graph
+        
+        self.graph = graph
+    
+    def _compile_graph(self):
+        """Compile the LangGraph workflow."""
         workflow = StateGraph(State)
         
         # Add nodes
@@ -106,20 +175,38 @@ class ClaudeChatbot:
         )
         workflow.add_edge("tools", "agent")
         
-        self.graph = workflow.compile()
+        # The checkpointer keeps each conversation thread's messages inside the
+        # graph; the graph is shared per process, so it holds a bounded number
+        graph = workflow.compile(checkpointer=_BoundedMemorySaver(CHAT_MAX_THREADS))
         print("✓ LangGraph workflow compiled successfully")
+        return graph
     
     def _call_model(self, state: State):
-        """Call the Claude model."""
+        """Call the Claude model on the most recent part of the conversation."""
         messages = state["messages"]
         
-        # Add system message if this is the start
-        if len(messages) == 1 and isinstance(messages[0], HumanMessage):
-            system_msg = SystemMessage(content=self._get_system_instruction())
-            messages = [system_msg] + messages
+        # The thread keeps every turn, including full tool outputs; send only
+        # the latest turns that fit the budget, starting at a user message so
+        # tool calls stay paired with their results
+        recent = trim_messages(
+            messages,
+            max_tokens=CHAT_HISTORY_TOKEN_BUDGET,
+            token_counter=_approx_tokens,
+            strategy="last",
+            start_on="human",
+            include_system=False
+        )
+        if not recent:
+            # The current turn alone is over budget; it is still needed whole
+            last_human = max(i for i, message in enumerate(messages) if isinstance(message, HumanMessage))
+            recent = messages[last_human:]
+        
+        # Prepend the system message; it is not stored in the thread state
+        messages = [SystemMessage(content=self._get_system_instruction())] + list(recent)
         
         response = self.model.invoke(messages)
-        return {"messages": [response]}
+        tool_calls = state.get("tool_calls", 0) + (1 if getattr(response, "tool_calls", None) else 0)
+        return {"messages": [response], "tool_calls": tool_calls}
     
     def _should_continue(self, state: State):
         """Determine if we should continue to tools or end."""
@@ -168,21 +255,11 @@ If users ask about their courses or classroom data, start by calling get_courses
             }
             self.conversation_history.append(user_message)
             
-            # Create messages for LangGraph
-            messages = []
-            
-            # Add conversation history as context
-            for msg in self.conversation_history[-10:]:  # Last 10 messages for context
-                if msg["role"] == "user":
-                    messages.append(HumanMessage(content=msg["content"]))
-                elif msg["role"] == "assistant":
-                    messages.append(SystemMessage(content=f"Previous response: {msg['content'][:200]}..."))
-            
-            # Add current message
-            messages.append(HumanMessage(content=message))
-            
-            # Run the graph
-            result = self.graph.invoke({"messages": messages})
+            # Run the graph; earlier turns are restored from the checkpointer
+            result = self.graph.invoke(
+                {"messages": [HumanMessage(content=message)], "tool_calls": 0},
+                config=self._thread_config(user_id)
+            )
             
             # Extract response
             final_message = result["messages"][-1]
@@ -203,7 +280,7 @@ If users ask about their courses or classroom data, start by calling get_courses
                 "timestamp": ai_message["timestamp"],
                 "conversation_id": len(self.conversation_history),
                 "model_type": self.get_model_type(),
-                "tools_used": len([msg for msg in result["messages"] if hasattr(msg, 'tool_calls') and msg.tool_calls]),
+                "tools_used": result.get("tool_calls", 0),
                 "error": None
             }
             
@@ -228,6 +305,74 @@ If users ask about their courses or classroom data, start by calling get_courses
             
             return error_response
     
+    async def send_message_stream(
+        self,
+        message: str,
+        user_id: str = "user",
+        flush_interval: float = 0.05,
+        flush_bytes: int = 256
+    ) -> AsyncIterator[str]:
+        """Send a message and yield the response text as it is generated.
+        
+        Token deltas are buffered and flushed every ``flush_interval`` seconds
+        or once ``flush_bytes`` have accumulated, whichever comes first.
+        """
+        self.conversation_history.append({
+            "role": "user",
+            "content": message,
+            "timestamp": time.time(),
+            "user_id": user_id
+        })
+        
+        parts = []
+        buffer = []
+        buffered = 0
+        last_flush = time.monotonic()
+        
+        async for chunk, metadata in self.graph.astream(
+            {"messages": [HumanMessage(content=message)], "tool_calls": 0},
+            config=self._thread_config(user_id),
+            stream_mode="messages"
+        ):
+            # Only forward model output, not tool results
+            if metadata.get("langgraph_node") != "agent" or not isinstance(chunk, AIMessageChunk):
+                continue
+            
+            if isinstance(chunk.content, str):
+                text = chunk.content
+            else:
+                text = "".join(
+                    block.get("text", "") for block in chunk.content
+                    if isinstance(block, dict) and block.get("type") == "text"
+                )
+            if not text:
+                continue
+            
+            parts.append(text)
+            buffer.append(text)
+            buffered += len(text.encode())
+            
+            now = time.monotonic()
+            if buffered >= flush_bytes or now - last_flush >= flush_interval:
+                yield "".join(buffer)
+                buffer = []
+                buffered = 0
+                last_flush = now
+        
+        if buffer:
+            yield "".join(buffer)
+        
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": "".join(parts),
+            "timestamp": time.time(),
+            "user_id": user_id
+        })
+    
+    def _thread_config(self, user_id: str) -> Dict[str, Any]:
+        """Return the graph config selecting this session's conversation thread."""
+        return {"configurable": {"thread_id": f"{self.session_id}:{user_id}"}}
+    
     def get_model_type(self) -> str:
         """Return the model type identifier."""
         return "Claude Haiku + LangGraph Tools"
@@ -238,7 +383,11 @@ If users ask about their courses or classroom data, start by calling get_courses
     
     def clear_conversation(self):
         """Clear the conversation history and start fresh."""
+        user_ids = {message["user_id"] for message in self.conversation_history if "user_id" in message}
+        for user_id in user_ids:
+            self.graph.checkpointer.delete_thread(self._thread_config(user_id)["configurable"]["thread_id"])
         self.conversation_history = []
+        self.session_id = uuid.uuid4().hex
     
     def export_conversation(self, file_path: str = None) -> str:
         """Export conversation history to a JSON file."""
@@ -253,8 +402,7 @@ If users ask about their courses or classroom data, start by calling get_courses
             "tools_available": [tool.name for tool in self.tools]
         }
         
-        with open(file_path, 'w') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        Path(file_path).write_bytes(orjson.dumps(export_data, option=orjson.OPT_INDENT_2, default=str))
         
         return file_path
 
@@ -6,9 +6,10 @@ Provides conversational AI for educational queries with actual Google Classroom
 
 import os
 import sys
-import json
+import orjson
 import yaml
 import time
+import functools
 from pathlib import Path
 from typing import Optional, Dict, List, Any, Annotated, TypedDict
 
@@ -52,8 +53,10 @@ class GeminiChatbot:
         self._initialize_model()
         self._build_graph()
     
-    def _get_config(self) -> Optional[Dict]:
-        """Load configuration from config.yml."""
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _get_config() -> Optional[Dict]:
+        """Load configuration from config.yml (parsed once per process)."""
         try:
             config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yml')
             with open(config_path, "r") as file:
@@ -203,7 +206,7 @@ If users ask about their courses or classroom data, start by calling get_courses
                 "timestamp": ai_message["timestamp"],
                 "conversation_id": len(self.conversation_history),
                 "model_type": self.get_model_type(),
-                "tools_used": len([msg for msg in result["messages"] if hasattr(msg, 'tool_calls') and msg.tool_calls]),
+                "tools_used": sum(1 for msg in result["messages"] if getattr(msg, 'tool_calls', None)),
                 "error": None
             }
             
@@ -253,8 +256,7 @@ If users ask about their courses or classroom data, start by calling get_courses
             "tools_available": [tool.name for tool in self.tools]
         }
         
-        with open(file_path, 'w') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        Path(file_path).write_bytes(orjson.dumps(export_data, option=orjson.OPT_INDENT_2, default=str))
         
         return file_path
 
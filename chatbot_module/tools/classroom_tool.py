@@ -3,15 +3,22 @@
 Google Classroom tools for LangGraph educational agent.
 """
 
-import sys
-from pathlib import Path
+import orjson
 from typing import Dict, List, Any, Optional
 from langchain_core.tools import tool
 
-# Add parent directories to path for imports
-parent_dir = Path(__file__).parent.parent.parent
-if str(parent_dir) not in sys.path:
-    sys.path.append(str(parent_dir))
+from src import classroom_handler
+from ocr_module.classroom_uploader import OCRClassroomUploader
+
+_uploader = None
+
+
+def _get_uploader() -> OCRClassroomUploader:
+    """Return the shared classroom uploader, creating it on first use."""
+    global _uploader
+    if _uploader is None or not _uploader.service:
+        _uploader = OCRClassroomUploader()
+    return _uploader
 
 
 @tool 
@@ -22,7 +29,6 @@ def get_courses() -> str:
         JSON string with course information including names, IDs, sections, and status.
     """
     try:
-        import classroom_handler
         courses = classroom_handler.list_courses()
         
         if not courses:
@@ -41,11 +47,10 @@ def get_courses() -> str:
             }
             course_list.append(course_info)
         
-        import json
-        return json.dumps({
+        return orjson.dumps({
             "total_courses": len(course_list),
             "courses": course_list
-        }, indent=2)
+        }).decode()
         
     except Exception as e:
         return f"Error fetching courses: {str(e)}"
@@ -62,24 +67,22 @@ def get_course_details(course_id: str) -> str:
         JSON string with detailed course information
     """
     try:
-        import classroom_handler
-        # For now, we'll get all courses and filter
-        courses = classroom_handler.list_courses()
+        target_course = classroom_handler.get_course_details(course_id)
         
-        target_course = None
-        for course in courses:
-            if course.get("id") == course_id:
-                target_course = course
-                break
+        # Fall back to scanning the course list if the direct lookup failed
+        if not target_course:
+            for course in classroom_handler.list_courses():
+                if course.get("id") == course_id:
+                    target_course = course
+                    break
         
         if not target_course:
             return f"Course with ID {course_id} not found."
         
-        import json
-        return json.dumps({
+        return orjson.dumps({
             "course": target_course,
             "message": f"Found course: {target_course.get('name', 'Unknown')}"
-        }, indent=2)
+        }).decode()
         
     except Exception as e:
         return f"Error getting course details: {str(e)}"
@@ -99,9 +102,7 @@ def create_assignment(course_id: str, title: str, description: str, assignment_t
         Success/failure message with assignment details
     """
     try:
-        from ocr_module.classroom_uploader import OCRClassroomUploader
-        
-        uploader = OCRClassroomUploader()
+        uploader = _get_uploader()
         
         # Create assignment data structure
         assignment_data = {
@@ -120,8 +121,9 @@ def create_assignment(course_id: str, title: str, description: str, assignment_t
             assignment_type=assignment_type
         )
         
-        import json
-        return json.dumps(result, indent=2)
+        classroom_handler.clear_courses_cache()
+        
+        return orjson.dumps(result).decode()
         
     except Exception as e:
         return f"Error creating assignment: {str(e)}"
@@ -139,20 +141,19 @@ def upload_material(course_id: str, material_data: str) -> str:
         Success/failure message with upload details
     """
     try:
-        from ocr_module.classroom_uploader import OCRClassroomUploader
-        import json
-        
         # Parse material data
-        material_info = json.loads(material_data)
+        material_info = orjson.loads(material_data)
         
-        uploader = OCRClassroomUploader()
+        uploader = _get_uploader()
         result = uploader.upload_to_classroom(
             course_id=course_id,
             ocr_data=material_info,
             assignment_type="material"
         )
         
-        return json.dumps(result, indent=2)
+        classroom_handler.clear_courses_cache()
+        
+        return orjson.dumps(result).decode()
         
     except Exception as e:
         return f"Error uploading material: {str(e)}"
@@ -3,15 +3,36 @@
 OCR processing tools for LangGraph educational agent.
 """
 
-import sys
-from pathlib import Path
-from typing import Dict, Any
+import os
+import asyncio
+import orjson
+from typing import Dict, Any, List
 from langchain_core.tools import tool
 
-# Add parent directories to path for imports
-parent_dir = Path(__file__).parent.parent.parent
-if str(parent_dir) not in sys.path:
-    sys.path.append(str(parent_dir))
+from ocr_module import OCRPipeline
+from src.generate_quiz import generate_quiz_with_gemini, generate_quiz_with_gemini_async
+
+_pipeline = None
+_pipeline_pid = None
+
+
+def _get_pipeline() -> OCRPipeline:
+    """Return this process's shared OCR pipeline, creating it on first use (and again after a fork)."""
+    global _pipeline, _pipeline_pid
+    if _pipeline is None or _pipeline_pid != os.getpid():
+        _pipeline = OCRPipeline()
+        _pipeline_pid = os.getpid()
+    return _pipeline
+
+
+def _quiz_lesson_plan(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the quiz generation lesson plan for a successful pipeline result."""
+    return {
+        'topic': result.get('extracted_data', {}).get('structured_data', {}).get('subject', 'General Knowledge'),
+        'content': result.get('ocr_result', {}).get('text', ''),
+        'number_of_questions': 5,
+        'response_type': 'multiple_choice_question'
+    }
 
 
 @tool
@@ -26,11 +47,7 @@ def process_image(image_path: str, extraction_type: str = "educational_content")
         JSON string with extracted content and metadata
     """
     try:
-        from ocr_module import OCRPipeline
-        import json
-        
-        # Initialize OCR pipeline
-        pipeline = OCRPipeline()
+        pipeline = _get_pipeline()
         
         # Process the image
         result = pipeline.process_image(
@@ -40,28 +57,27 @@ def process_image(image_path: str, extraction_type: str = "educational_content")
         )
         
         if result.get('pipeline_status') == 'success':
-            return json.dumps({
+            return orjson.dumps({
                 "success": True,
                 "extracted_text": result.get('ocr_result', {}).get('text', ''),
                 "structured_data": result.get('extracted_data', {}).get('structured_data', {}),
                 "confidence_score": result.get('extracted_data', {}).get('confidence_score', 0),
                 "extraction_type": extraction_type,
                 "message": "Image processed successfully"
-            }, indent=2)
+            }).decode()
         else:
-            return json.dumps({
+            return orjson.dumps({
                 "success": False,
                 "error": result.get('error', 'Unknown OCR error'),
                 "message": "Failed to process image"
-            }, indent=2)
+            }).decode()
             
     except Exception as e:
-        import json
-        return json.dumps({
+        return orjson.dumps({
             "success": False,
             "error": str(e),
             "message": "OCR processing failed"
-        }, indent=2)
+        }).decode()
 
 
 @tool
@@ -75,11 +91,7 @@ def extract_quiz_from_image(image_path: str) -> str:
         JSON string with generated quiz questions and answers
     """
     try:
-        from ocr_module import OCRPipeline
-        import json
-        
-        # Initialize OCR pipeline
-        pipeline = OCRPipeline()
+        pipeline = _get_pipeline()
         
         # Process image with quiz extraction
         result = pipeline.process_image(
@@ -90,36 +102,99 @@ def extract_quiz_from_image(image_path: str) -> str:
         
         if result.get('pipeline_status') == 'success':
             # Generate quiz from the extracted content
-            from src.generate_quiz import generate_quiz_with_gemini
-            
-            ocr_text = result.get('ocr_result', {}).get('text', '')
-            lesson_plan = {
-                'topic': result.get('extracted_data', {}).get('structured_data', {}).get('subject', 'General Knowledge'),
-                'content': ocr_text,
-                'number_of_questions': 5,
-                'response_type': 'multiple_choice_question'
-            }
+            lesson_plan = _quiz_lesson_plan(result)
+            ocr_text = lesson_plan['content']
             
             quiz_data = generate_quiz_with_gemini(lesson_plan)
             
-            return json.dumps({
+            return orjson.dumps({
                 "success": True,
                 "quiz_data": quiz_data,
                 "source_text": ocr_text,
                 "confidence_score": result.get('extracted_data', {}).get('confidence_score', 0),
                 "message": "Quiz generated successfully from image"
-            }, indent=2)
+            }).decode()
         else:
-            return json.dumps({
+            return orjson.dumps({
                 "success": False,
                 "error": result.get('error', 'Failed to extract content from image'),
                 "message": "Could not generate quiz from image"
-            }, indent=2)
+            }).decode()
             
     except Exception as e:
-        import json
-        return json.dumps({
+        return orjson.dumps({
             "success": False,
             "error": str(e),
             "message": "Quiz generation from image failed"
-        }, indent=2)
\ No newline at end of file
+        }).decode()
+
+
+async def _batch_quizzes_async(image_paths: List[str]) -> List[Dict[str, Any]]:
+    """OCR and extract every image through the shared pipeline, then generate their quizzes concurrently."""
+    pipeline_results = await _get_pipeline().process_batch_async(
+        image_paths, extraction_type="quiz", preprocess=True
+    )
+    
+    ok = [result for result in pipeline_results if result.get('pipeline_status') == 'success']
+    lesson_plans = [_quiz_lesson_plan(result) for result in ok]
+    
+    # Bounded by gemini_handler's shared quota and concurrency limits
+    quizzes = await asyncio.gather(*(generate_quiz_with_gemini_async(plan) for plan in lesson_plans))
+    generated = iter(zip(lesson_plans, quizzes))
+    
+    results = []
+    for path, result in zip(image_paths, pipeline_results):
+        if result.get('pipeline_status') != 'success':
+            results.append({
+                "image_path": path,
+                "success": False,
+                "error": result.get('error', 'Failed to extract content from image')
+            })
+            continue
+        plan, quiz = next(generated)
+        results.append({
+            "image_path": path,
+            "success": True,
+            "quiz_data": quiz,
+            "source_text": plan['content'],
+            "confidence_score": result.get('extracted_data', {}).get('confidence_score', 0)
+        })
+    return results
+
+
+@tool
+def batch_extract_quiz_from_images(image_paths: List[str]) -> str:
+    """Extract quiz questions from several images in one call.
+    
+    Images go through the shared OCR pipeline's batch mode (preprocessing,
+    shared tesseract runs and quiz extraction), and the quiz generation
+    requests are issued concurrently under the shared Gemini limits.
+    
+    Args:
+        image_paths: Paths to the image files containing quiz content
+        
+    Returns:
+        JSON string with one quiz result per image, in input order
+    """
+    try:
+        if not image_paths:
+            return orjson.dumps({
+                "success": False,
+                "error": "No image paths provided",
+                "message": "Nothing to process"
+            }).decode()
+        
+        results = asyncio.run(_batch_quizzes_async(image_paths))
+        
+        return orjson.dumps({
+            "success": any(r["success"] for r in results),
+            "results": results,
+            "message": f"Generated quizzes for {sum(1 for r in results if r['success'])} of {len(results)} images"
+        }).decode()
+        
+    except Exception as e:
+        return orjson.dumps({
+            "success": False,
+            "error": str(e),
+            "message": "Batch quiz generation from images failed"
+        }).decode()
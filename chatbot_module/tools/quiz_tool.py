@@ -3,15 +3,223 @@
 Quiz generation tools for LangGraph educational agent.
 """
 
-import sys
-from pathlib import Path
-from typing import Dict, Any
+import re
+import math
+import time
+import asyncio
+import hashlib
+import threading
+import orjson
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List
 from langchain_core.tools import tool
 
-# Add parent directories to path for imports
-parent_dir = Path(__file__).parent.parent.parent
-if str(parent_dir) not in sys.path:
-    sys.path.append(str(parent_dir))
+from src.generate_quiz import generate_quiz_with_gemini, generate_quiz_with_gemini_async, generate_fallback_quiz
+from ocr_module.classroom_uploader import OCRClassroomUploader
+from src.classroom_handler import new_async_client
+
+_uploader = None
+
+
+def _get_uploader() -> OCRClassroomUploader:
+    """Return the shared classroom uploader, creating it on first use."""
+    global _uploader
+    if _uploader is None or not _uploader.service:
+        _uploader = OCRClassroomUploader()
+    return _uploader
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool response envelope as indented JSON."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
+_loads = orjson.loads
+
+
+# Approximate prompt budget for lesson content (tokens ~= characters / 4)
+QUIZ_CONTENT_TOKEN_BUDGET = 5000
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r'[a-z]{4,}')
+
+
+def _trim_for_tokens(content: str, budget: int = QUIZ_CONTENT_TOKEN_BUDGET) -> str:
+    """Reduce content to its most representative sentences within a token budget.
+    
+    Sentences are scored by how often their words recur across the whole text,
+    the best ones are kept until the budget is spent, and the survivors are
+    returned in their original order.
+    """
+    max_chars = budget * 4
+    if len(content) <= max_chars:
+        return content
+    
+    sentences = _SENTENCE_RE.split(content.strip())
+    words = [set(_WORD_RE.findall(sentence.lower())) for sentence in sentences]
+    frequency = Counter(word for sentence_words in words for word in sentence_words)
+    
+    def score(index: int) -> float:
+        sentence_words = words[index]
+        if not sentence_words:
+            return 0.0
+        return sum(frequency[word] for word in sentence_words) / math.sqrt(len(sentence_words))
+    
+    selected = {}
+    used = 0
+    for index in sorted(range(len(sentences)), key=score, reverse=True):
+        remaining = max_chars - used
+        if remaining <= 1:
+            break
+        sentence = sentences[index]
+        if len(sentence) + 1 > remaining:
+            # Text without sentence punctuation splits into one oversize
+            # "sentence"; keep as much of it as still fits
+            sentence = sentence[:remaining - 1]
+        selected[index] = sentence
+        used += len(sentence) + 1
+    
+    if not selected:
+        return content[:max_chars]
+    return " ".join(selected[index] for index in sorted(selected))
+
+
+# Generated quizzes are reused for identical requests within the TTL
+QUIZ_CACHE_SIZE = 128
+QUIZ_CACHE_TTL = 3600
+
+_quiz_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_quiz_cache_lock = threading.Lock()
+
+
+def _quiz_cache_key(lesson_plan: Dict[str, Any]) -> str:
+    """Hash a lesson plan, ignoring whitespace differences in its content."""
+    normalized = dict(lesson_plan, content=" ".join(lesson_plan.get('content', '').split()))
+    return hashlib.blake2b(orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def _cached_quiz(key: str):
+    """Return the cached quiz for key, or None when it is missing or expired."""
+    with _quiz_cache_lock:
+        entry = _quiz_cache.get(key)
+        if entry and time.monotonic() - entry[0] < QUIZ_CACHE_TTL:
+            _quiz_cache.move_to_end(key)
+            return _loads(entry[1])
+    return None
+
+
+def _store_quiz(key: str, lesson_plan: Dict[str, Any], quiz_data: Dict[str, Any]):
+    """Cache a generated quiz, unless it is the fallback returned when Gemini is unavailable."""
+    if quiz_data != generate_fallback_quiz(lesson_plan):
+        with _quiz_cache_lock:
+            _quiz_cache[key] = (time.monotonic(), orjson.dumps(quiz_data))
+            _quiz_cache.move_to_end(key)
+            while len(_quiz_cache) > QUIZ_CACHE_SIZE:
+                _quiz_cache.popitem(last=False)
+
+
+def _generate_quiz_cached(lesson_plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate a quiz, serving repeat requests from an in-process LRU cache."""
+    key = _quiz_cache_key(lesson_plan)
+    quiz_data = _cached_quiz(key)
+    if quiz_data is None:
+        quiz_data = generate_quiz_with_gemini(lesson_plan)
+        _store_quiz(key, lesson_plan, quiz_data)
+    return quiz_data
+
+
+async def _generate_quiz_cached_async(lesson_plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Async _generate_quiz_cached; the Gemini call waits on the shared quota and concurrency limits."""
+    key = _quiz_cache_key(lesson_plan)
+    quiz_data = _cached_quiz(key)
+    if quiz_data is None:
+        quiz_data = await generate_quiz_with_gemini_async(lesson_plan)
+        _store_quiz(key, lesson_plan, quiz_data)
+    return quiz_data
+
+
+def _quiz_lesson_plan(content: str, topic: str, num_questions: int) -> Dict[str, Any]:
+    """Create the lesson plan structure for quiz generation."""
+    return {
+        'topic': topic,
+        'content': _trim_for_tokens(content),
+        'number_of_questions': num_questions,
+        'response_type': 'multiple_choice_question'
+    }
+
+
+def _quiz_envelope(topic: str, quiz_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap a generated quiz in the tool response envelope."""
+    return {
+        "success": True,
+        "quiz": quiz_data,
+        "topic": topic,
+        "num_questions": len(quiz_data.get('questions', [])),
+        "message": f"Generated {len(quiz_data.get('questions', []))} quiz questions for {topic}"
+    }
+
+
+def _generate_quiz_impl(content: str, topic: str, num_questions: int) -> Dict[str, Any]:
+    """Generate a quiz and return the response envelope as a dict."""
+    quiz_data = _generate_quiz_cached(_quiz_lesson_plan(content, topic, num_questions))
+    return _quiz_envelope(topic, quiz_data)
+
+
+async def _generate_quiz_impl_async(content: str, topic: str, num_questions: int) -> Dict[str, Any]:
+    """Async _generate_quiz_impl."""
+    quiz_data = await _generate_quiz_cached_async(_quiz_lesson_plan(content, topic, num_questions))
+    return _quiz_envelope(topic, quiz_data)
+
+
+def _classroom_quiz_data(quiz: Dict[str, Any], title: str = None) -> Dict[str, Any]:
+    """Wrap a quiz dict in the structure the classroom uploader expects."""
+    return {
+        "structured_data": {
+            "title": title or quiz.get("title", "Generated Quiz"),
+            "questions": quiz.get("questions", []),
+            "quiz_type": "multiple_choice",
+            "content_source": "ai_generated"
+        },
+        "confidence_score": 0.9,
+        "extraction_type": "quiz"
+    }
+
+
+def _quiz_upload_envelope(course_id: str, quiz: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the tool response envelope for a quiz upload result."""
+    return {
+        "success": result.get("success", False),
+        "quiz_title": result.get("title", "Unknown"),
+        "course_id": course_id,
+        "num_questions": len(quiz.get("questions", [])),
+        "message": f"Quiz uploaded to Google Classroom: {result.get('title', 'Unknown')}"
+    }
+
+
+def _create_classroom_quiz_impl(course_id: str, quiz: Dict[str, Any], title: str = None) -> Dict[str, Any]:
+    """Upload a quiz dict to Google Classroom and return the response envelope as a dict."""
+    result = _get_uploader().upload_to_classroom(
+        course_id=course_id,
+        ocr_data=_classroom_quiz_data(quiz, title),
+        assignment_type="quiz"
+    )
+    return _quiz_upload_envelope(course_id, quiz, result)
+
+
+async def _create_classroom_quiz_impl_async(
+    course_id: str,
+    quiz: Dict[str, Any],
+    title: str = None,
+    client=None
+) -> Dict[str, Any]:
+    """Async variant of _create_classroom_quiz_impl, uploading over client when given."""
+    result = await _get_uploader().upload_to_classroom_async(
+        course_id=course_id,
+        ocr_data=_classroom_quiz_data(quiz, title),
+        assignment_type="quiz",
+        client=client
+    )
+    return _quiz_upload_envelope(course_id, quiz, result)
 
 
 @tool
@@ -27,35 +235,14 @@ def generate_quiz(content: str, topic: str = "General Knowledge", num_questions:
         JSON string with generated quiz questions and answers
     """
     try:
-        from src.generate_quiz import generate_quiz_with_gemini
-        import json
-        
-        # Create lesson plan structure for quiz generation
-        lesson_plan = {
-            'topic': topic,
-            'content': content,
-            'number_of_questions': num_questions,
-            'response_type': 'multiple_choice_question'
-        }
-        
-        # Generate quiz using existing quiz generation logic
-        quiz_data = generate_quiz_with_gemini(lesson_plan)
-        
-        return json.dumps({
-            "success": True,
-            "quiz": quiz_data,
-            "topic": topic,
-            "num_questions": len(quiz_data.get('questions', [])),
-            "message": f"Generated {len(quiz_data.get('questions', []))} quiz questions for {topic}"
-        }, indent=2)
+        return _dumps(_generate_quiz_impl(content, topic, num_questions))
         
     except Exception as e:
-        import json
-        return json.dumps({
+        return _dumps({
             "success": False,
             "error": str(e),
             "message": "Failed to generate quiz"
-        }, indent=2)
+        })
 
 
 @tool
@@ -71,11 +258,8 @@ def create_classroom_quiz(course_id: str, quiz_data: str, title: str = None) ->
         Success/failure message with quiz upload details
     """
     try:
-        from ocr_module.classroom_uploader import OCRClassroomUploader
-        import json
-        
         # Parse quiz data
-        quiz_info = json.loads(quiz_data)
+        quiz_info = _loads(quiz_data)
         
         # Extract quiz from the data structure
         if "quiz" in quiz_info:
@@ -83,41 +267,14 @@ def create_classroom_quiz(course_id: str, quiz_data: str, title: str = None) ->
         else:
             quiz = quiz_info
         
-        # Prepare quiz data for classroom upload
-        classroom_data = {
-            "structured_data": {
-                "title": title or quiz.get("title", "Generated Quiz"),
-                "questions": quiz.get("questions", []),
-                "quiz_type": "multiple_choice",
-                "content_source": "ai_generated"
-            },
-            "confidence_score": 0.9,
-            "extraction_type": "quiz"
-        }
-        
-        # Upload to Google Classroom
-        uploader = OCRClassroomUploader()
-        result = uploader.upload_to_classroom(
-            course_id=course_id,
-            ocr_data=classroom_data,
-            assignment_type="quiz"
-        )
-        
-        return json.dumps({
-            "success": result.get("success", False),
-            "quiz_title": result.get("title", "Unknown"),
-            "course_id": course_id,
-            "num_questions": len(quiz.get("questions", [])),
-            "message": f"Quiz uploaded to Google Classroom: {result.get('title', 'Unknown')}"
-        }, indent=2)
+        return _dumps(_create_classroom_quiz_impl(course_id, quiz, title))
         
     except Exception as e:
-        import json
-        return json.dumps({
+        return _dumps({
             "success": False,
             "error": str(e),
             "message": "Failed to upload quiz to Google Classroom"
-        }, indent=2)
+        })
 
 
 @tool
@@ -133,25 +290,13 @@ def generate_lesson_quiz(lesson_content: str, course_id: str, topic: str = "Less
         Complete workflow result with quiz generation and upload status
     """
     try:
-        import json
-        
         # Step 1: Generate quiz
-        quiz_result = generate_quiz(lesson_content, topic, 5)
-        quiz_data = json.loads(quiz_result)
-        
-        if not quiz_data.get("success"):
-            return quiz_result  # Return the error from quiz generation
+        quiz_data = _generate_quiz_impl(lesson_content, topic, 5)
         
         # Step 2: Upload to classroom
-        upload_result = create_classroom_quiz(
-            course_id=course_id,
-            quiz_data=json.dumps(quiz_data["quiz"]),
-            title=f"Quiz: {topic}"
-        )
-        
-        upload_data = json.loads(upload_result)
+        upload_data = _create_classroom_quiz_impl(course_id, quiz_data["quiz"], f"Quiz: {topic}")
         
-        return json.dumps({
+        return _dumps({
             "success": upload_data.get("success", False),
             "quiz_generated": True,
             "quiz_uploaded": upload_data.get("success", False),
@@ -159,12 +304,91 @@ def generate_lesson_quiz(lesson_content: str, course_id: str, topic: str = "Less
             "num_questions": quiz_data.get("num_questions", 0),
             "course_id": course_id,
             "message": f"Complete workflow: Generated and uploaded quiz '{topic}' with {quiz_data.get('num_questions', 0)} questions"
-        }, indent=2)
+        })
         
     except Exception as e:
-        import json
-        return json.dumps({
+        return _dumps({
             "success": False,
             "error": str(e),
             "message": "Failed to complete lesson quiz workflow"
-        }, indent=2)
\ No newline at end of file
+        })
+
+
+async def _generate_lesson_quiz_async(
+    lesson_content: str,
+    course_id: str,
+    topic: str = "Lesson Quiz",
+    client=None
+) -> Dict[str, Any]:
+    """Run the generate-then-upload workflow for one lesson without blocking the event loop."""
+    try:
+        quiz_data = await _generate_quiz_impl_async(lesson_content, topic, 5)
+        upload_data = await _create_classroom_quiz_impl_async(
+            course_id, quiz_data["quiz"], f"Quiz: {topic}", client=client
+        )
+        
+        return {
+            "success": upload_data.get("success", False),
+            "quiz_generated": True,
+            "quiz_uploaded": upload_data.get("success", False),
+            "quiz_title": upload_data.get("quiz_title", topic),
+            "num_questions": quiz_data.get("num_questions", 0),
+            "course_id": course_id,
+            "topic": topic
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "course_id": course_id,
+            "topic": topic,
+            "error": str(e)
+        }
+
+
+async def _generate_lesson_quizzes_async(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run the lesson quiz workflow for every item concurrently, sharing one Classroom client.
+    
+    The Gemini calls are bounded by gemini_handler's shared quota and
+    concurrency limits, however many items there are.
+    """
+    # The client is closed before asyncio.run tears the loop down
+    async with new_async_client() as client:
+        return await asyncio.gather(*[
+            _generate_lesson_quiz_async(
+                lesson_content=item.get("lesson_content", ""),
+                course_id=item.get("course_id", ""),
+                topic=item.get("topic", "Lesson Quiz"),
+                client=client
+            )
+            for item in items
+        ])
+
+
+@tool
+def generate_lesson_quizzes_batch(items: List[Dict[str, Any]]) -> str:
+    """Generate quizzes for several lessons and upload them to Google Classroom concurrently.
+    
+    Args:
+        items: List of objects with lesson_content, course_id and optional topic
+        
+    Returns:
+        JSON string with one workflow result per item, in input order
+    """
+    try:
+        results = asyncio.run(_generate_lesson_quizzes_async(items))
+        uploaded = sum(1 for result in results if result.get("success"))
+        
+        return _dumps({
+            "success": uploaded > 0,
+            "results": results,
+            "message": f"Generated and uploaded {uploaded} of {len(results)} lesson quizzes"
+        })
+        
+    except Exception as e:
+        return _dumps({
+            "success": False,
+            "error": str(e),
+            "message": "Failed to complete batch lesson quiz workflow"
+        })
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Checks for the quiz tool's lesson content trimming
+"""
+
+from chatbot_module.tools.quiz_tool import QUIZ_CONTENT_TOKEN_BUDGET, _trim_for_tokens
+
+MAX_CHARS = QUIZ_CONTENT_TOKEN_BUDGET * 4
+
+def test_short_content_unchanged():
+    """Content within the budget is returned as is"""
+    content = "Photosynthesis turns light into chemical energy."
+    assert _trim_for_tokens(content) == content
+
+def test_content_without_punctuation():
+    """OCR text with no sentence punctuation is truncated, not dropped"""
+    trimmed = _trim_for_tokens('word ' * 6000)
+    assert trimmed
+    assert len(trimmed) <= MAX_CHARS
+    assert trimmed.startswith('word word')
+
+def test_oversize_sentence_fills_remaining_budget():
+    """A sentence longer than the budget still contributes content"""
+    content = "Cells divide. " + "mitosis " * 5000 + "end."
+    trimmed = _trim_for_tokens(content)
+    assert 0 < len(trimmed) <= MAX_CHARS
+    assert "mitosis" in trimmed
+
+if __name__ == "__main__":
+    test_short_content_unchanged()
+    test_content_without_punctuation()
+    test_oversize_sentence_fills_remaining_budget()
+    print("All quiz tool checks passed")
@@ -0,0 +1,75 @@
+"""
+Shared PostgreSQL connection helper for the database maintenance scripts.
+"""
+
+import os
+import functools
+from psycopg.conninfo import conninfo_to_dict
+from psycopg_pool import ConnectionPool
+from dotenv import load_dotenv
+
+# Upper bound on connections the scripts hold open at once
+POOL_MAX_CONNECTIONS = 8
+
+# Tags the scripts' sessions in pg_stat_activity and the server logs
+APPLICATION_NAME = os.environ.get('POSTGRES_APPLICATION_NAME', 'edu-app') + '-scripts'
+
+# Hosts reached without TLS, e.g. the docker-compose postgres service
+LOCAL_HOSTS = {'', 'localhost', '127.0.0.1', '::1'}
+
+_pool = None
+
+@functools.lru_cache(maxsize=1)
+def get_database_url():
+    """Load .env once and return DATABASE_URL."""
+    load_dotenv()
+    return os.getenv("DATABASE_URL")
+
+def _ssl_options(db_url):
+    """Require TLS (as Supabase does) unless DATABASE_URL or PGSSLMODE picks a mode or the server is local."""
+    params = conninfo_to_dict(db_url)
+    host = params.get('host', '')
+    if 'sslmode' in params or os.getenv('PGSSLMODE') or host in LOCAL_HOSTS or host.startswith('/'):
+        return {}
+    return {'sslmode': 'require'}
+
+def _get_pool():
+    """Create the process-wide connection pool on first use.
+
+    DATABASE_URL may point at Supabase's PgBouncer transaction pooler
+    (port 6543) to share server connections across script runs as well.
+    """
+    global _pool
+    if _pool is None:
+        db_url = get_database_url()
+        if not db_url:
+            raise RuntimeError("DATABASE_URL environment variable not set")
+
+        # libpq parses postgresql:// URIs natively; kwargs are merged in. Server-side
+        # prepared statements stay off, as the transaction pooler cannot track them
+        _pool = ConnectionPool(
+            db_url,
+            kwargs={'application_name': APPLICATION_NAME, 'prepare_threshold': None, **_ssl_options(db_url)},
+            min_size=1,
+            max_size=POOL_MAX_CONNECTIONS,
+            open=True
+        )
+    return _pool
+
+def open_conn(autocommit=True):
+    """Check out a connection to the database named by DATABASE_URL.
+
+    Args:
+        autocommit: Whether each statement commits on its own
+
+    Returns:
+        An open psycopg connection; hand it back with release_conn
+    """
+    conn = _get_pool().getconn()
+    conn.autocommit = autocommit
+    print(f"Connected to database at {conn.info.host}:{conn.info.port}")
+    return conn
+
+def release_conn(conn):
+    """Return a connection from open_conn to the pool, rolling back any open transaction."""
+    _get_pool().putconn(conn)
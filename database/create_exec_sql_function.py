@@ -1,44 +1,15 @@
 import os
 import sys
-import psycopg2
-from urllib.parse import urlparse
-from dotenv import load_dotenv
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from _conn import open_conn, release_conn
+
 def create_exec_sql_function():
     """Create a SQL function to execute arbitrary SQL using direct PostgreSQL connection"""
     try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Get database connection string
-        db_url = os.getenv("DATABASE_URL")
-        if not db_url:
-            print("DATABASE_URL environment variable not set")
-            return False
-        
-        # Parse the connection string
-        parsed_url = urlparse(db_url)
-        
-        # Extract connection parameters
-        dbname = parsed_url.path[1:]  # Remove leading slash
-        user = parsed_url.username
-        password = parsed_url.password
-        host = parsed_url.hostname
-        port = parsed_url.port
-        
-        # Connect to the database
-        print(f"Connecting to database at {host}:{port}...")
-        conn = psycopg2.connect(
-            dbname=dbname,
-            user=user,
-            password=password,
-            host=host,
-            port=port
-        )
-        conn.autocommit = True
+        conn = open_conn()
         
         # Create a cursor
         cur = conn.cursor()
@@ -59,7 +30,7 @@ def create_exec_sql_function():
         
         # Close the connection
         cur.close()
-        conn.close()
+        release_conn(conn)
         
         print("Created exec_sql function successfully!")
         return True
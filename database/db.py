@@ -1,159 +1,499 @@
 import os
-import psycopg2
-import psycopg2.extras
+import re
+import functools
+import threading
+import time
+import uuid
+import psycopg
+import sqlparse
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union, Tuple
+from pathlib import Path
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool, PoolTimeout
+from typing import Optional, List, Dict, Any, Iterator, Union, Tuple
+
+# Matches a RETURNING clause as a whole word (not e.g. a returning_date column)
+_RETURNING_RE = re.compile(r'\bRETURNING\b', re.IGNORECASE)
+
+SCHEMA_PATH = Path(__file__).with_name('schema.sql')
+
+@functools.lru_cache(maxsize=1)
+def _schema_sql() -> str:
+    """Return the contents of schema.sql, read from disk once per process."""
+    return SCHEMA_PATH.read_text()
+
+@functools.lru_cache(maxsize=1)
+def _schema_statements() -> Tuple[str, ...]:
+    """Split schema.sql into individual statements, keeping $$-quoted function bodies intact."""
+    return tuple(
+        stmt for stmt in sqlparse.split(_schema_sql())
+        if sqlparse.format(stmt, strip_comments=True).strip()
+    )
+
+# Seconds a cached lookup row is served before it is re-read; bounds how long
+# writes made by other processes stay invisible to this one
+LOOKUP_CACHE_TTL = float(os.environ.get('POSTGRES_LOOKUP_CACHE_TTL', '30'))
+
+# Getter method name -> table its rows come from, filled in by cached_method
+_LOOKUP_TABLES: Dict[str, str] = {}
+
+# Target tables of the writes in a statement (CTE bodies included)
+_WRITE_TARGET_RE = re.compile(
+    r'\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|MERGE\s+INTO)\s+(?:ONLY\s+)?(?:\w+\.)?"?(\w+)"?',
+    re.IGNORECASE
+)
+
+def cached_method(table: str, maxsize: int = 4096, ttl: float = LOOKUP_CACHE_TTL):
+    """Memoise a single-key lookup of a row of table in a per-instance LRU.
+    
+    Rows are handed out as copies so callers cannot mutate the cached entry.
+    Entries expire after ttl seconds, and any statement this instance runs
+    that writes to table drops them (see Database._clear_lookups_written_by).
+    """
+    def decorator(method):
+        name = method.__name__
+        _LOOKUP_TABLES[name] = table
+        
+        @functools.wraps(method)
+        def wrapper(self, key):
+            cache = self._lookup_caches.setdefault(name, OrderedDict())
+            with self._lookup_lock:
+                if key in cache:
+                    cached_at, row = cache[key]
+                    if time.monotonic() - cached_at < ttl:
+                        cache.move_to_end(key)
+                        return dict(row) if row is not None else None
+                    del cache[key]
+            
+            row = method(self, key)
+            with self._lookup_lock:
+                cache[key] = (time.monotonic(), row)
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return dict(row) if row is not None else None
+        
+        return wrapper
+    return decorator
+
+# Connection pool bounds; each thread checks out its own connection
+POOL_MIN_CONNECTIONS = int(os.environ.get('POSTGRES_POOL_MIN', '2'))
+POOL_MAX_CONNECTIONS = int(os.environ.get('POSTGRES_POOL_MAX', '20'))
+
+# Reported in pg_stat_activity and the server logs, so the app's sessions and slow queries are attributable
+APPLICATION_NAME = os.environ.get('POSTGRES_APPLICATION_NAME', 'edu-app')
+
+# SQL used by the Database methods
+_Q_ADD_TEACHER = """
+INSERT INTO teachers (first_name, last_name, email)
+VALUES (%s, %s, %s)
+RETURNING teacher_id
+"""
+
+_Q_GET_TEACHER = "SELECT * FROM teachers WHERE teacher_id = %s"
+
+# Insert-if-missing in one round-trip; DO NOTHING leaves an existing row (and
+# its updated_at) untouched, and the UNION picks up its ID instead
+_Q_UPSERT_TEACHER_BY_EMAIL = """
+WITH inserted AS (
+    INSERT INTO teachers (first_name, last_name, email)
+    VALUES (%(first_name)s, %(last_name)s, %(email)s)
+    ON CONFLICT (email) DO NOTHING
+    RETURNING teacher_id
+)
+SELECT teacher_id FROM inserted
+UNION ALL
+SELECT teacher_id FROM teachers WHERE email = %(email)s
+LIMIT 1
+"""
+
+_Q_ADD_STUDENT = """
+INSERT INTO students (first_name, last_name, email, date_of_birth)
+VALUES (%s, %s, %s, %s)
+RETURNING student_id
+"""
+
+_Q_GET_STUDENT = "SELECT * FROM students WHERE student_id = %s"
+
+_Q_UPSERT_STUDENT_BY_EMAIL = """
+WITH inserted AS (
+    INSERT INTO students (first_name, last_name, email, date_of_birth)
+    VALUES (%(first_name)s, %(last_name)s, %(email)s, %(date_of_birth)s)
+    ON CONFLICT (email) DO NOTHING
+    RETURNING student_id
+)
+SELECT student_id FROM inserted
+UNION ALL
+SELECT student_id FROM students WHERE email = %(email)s
+LIMIT 1
+"""
+
+_Q_ADD_CLASS = """
+INSERT INTO classes (class_name, academic_year, semester, description)
+VALUES (%s, %s, %s, %s)
+RETURNING class_id
+"""
+
+_Q_GET_CLASS = "SELECT * FROM classes WHERE class_id = %s"
+
+_Q_ADD_SUBJECT = """
+INSERT INTO subjects (subject_name, subject_code, description)
+VALUES (%s, %s, %s)
+RETURNING subject_id
+"""
+
+_Q_GET_SUBJECT = "SELECT * FROM subjects WHERE subject_id = %s"
+
+_Q_ENROLL_STUDENT = """
+INSERT INTO student_class (student_id, class_id, enrollment_date)
+VALUES (%s, %s, %s)
+RETURNING student_id
+"""
+
+_Q_ASSIGN_TEACHER = """
+INSERT INTO teacher_subject_class (teacher_id, subject_id, class_id, academic_year, semester)
+VALUES (%s, %s, %s, %s, %s)
+RETURNING teacher_id
+"""
+
+_Q_UPSERT_PERFORMANCE = """
+INSERT INTO student_subject_performance 
+(student_id, subject_id, class_id, academic_year, semester, score, grade, attendance)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT(student_id, subject_id, class_id, academic_year, semester)
+DO UPDATE SET 
+    score = COALESCE(EXCLUDED.score, student_subject_performance.score),
+    grade = COALESCE(EXCLUDED.grade, student_subject_performance.grade),
+    attendance = COALESCE(EXCLUDED.attendance, student_subject_performance.attendance),
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+_Q_RECORD_PERFORMANCE = _Q_UPSERT_PERFORMANCE + "RETURNING student_id\n"
+
+_Q_STUDENT_REPORT = """
+SELECT json_build_object(
+    'student', to_json(s),
+    'classes', (SELECT COALESCE(json_agg(x), '[]'::json)
+                FROM (
+                    SELECT c.class_id, c.class_name, sc.enrollment_date, sc.status
+                    FROM student_class sc
+                    JOIN classes c ON sc.class_id = c.class_id
+                    WHERE sc.student_id = s.student_id
+                ) x),
+    'performance', (SELECT COALESCE(json_agg(x ORDER BY x.academic_year DESC, x.semester), '[]'::json)
+                    FROM (
+                        SELECT s2.subject_id, s2.subject_name, sp.score, sp.grade, sp.attendance,
+                               c.class_name, sp.academic_year, sp.semester
+                        FROM student_subject_performance sp
+                        JOIN subjects s2 ON sp.subject_id = s2.subject_id
+                        JOIN classes c ON sp.class_id = c.class_id
+                        WHERE sp.student_id = s.student_id
+                    ) x)
+) AS report
+FROM students s
+WHERE s.student_id = %s
+"""
 
 class Database:
+    # Databases whose schema has already been applied in this process
+    _initialized = set()
+    
     def __init__(self, db_config: Dict[str, str] = None):
         """Initialize the database connection.
         
         Args:
             db_config: Dictionary with PostgreSQL connection parameters
         """
-        # Default configuration for PostgreSQL
-        self.db_config = db_config or {
+        # Default configuration for PostgreSQL; a given config may set its own application_name
+        self.db_config = {'application_name': APPLICATION_NAME, **(db_config or {
             'dbname': os.environ.get('POSTGRES_DB', 'edu_app'),
             'user': os.environ.get('POSTGRES_USER', 'postgres'),
             'password': os.environ.get('POSTGRES_PASSWORD', 'postgres'),
             'host': os.environ.get('POSTGRES_HOST', 'localhost'),
             'port': os.environ.get('POSTGRES_PORT', '5432')
-        }
+        })}
         
-        self.conn = None
+        self.pool = None
         self.connect()
-        self.initialize_database()
+        
+        # Per-getter LRU caches of rows looked up by primary key
+        self._lookup_caches = {}
+        self._lookup_lock = threading.Lock()
+        
+        # Connection of the transaction() block open on each thread, if any
+        self._local = threading.local()
+        
+        # The schema is idempotent DDL, so it only needs to run once per database
+        schema_key = (self.db_config.get('host'), str(self.db_config.get('port')), self.db_config.get('dbname'))
+        if schema_key not in Database._initialized:
+            self.initialize_database()
+            Database._initialized.add(schema_key)
     
     def connect(self):
-        """Establish a connection to the PostgreSQL database."""
+        """Create the pool of connections to the PostgreSQL database."""
         try:
-            self.conn = psycopg2.connect(**self.db_config)
-            # Set autocommit to False for transaction control
-            self.conn.autocommit = False
-        except psycopg2.Error as e:
+            self.pool = ConnectionPool(
+                kwargs=self.db_config,
+                min_size=min(POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS),
+                max_size=POOL_MAX_CONNECTIONS,
+                open=True
+            )
+            # Fail fast if the database is unreachable
+            self.pool.wait()
+        except (psycopg.Error, PoolTimeout) as e:
             print(f"Error connecting to PostgreSQL: {e}")
             raise
     
     def close(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
+        """Close all pooled database connections."""
+        if self.pool:
+            self.pool.close()
+    
+    @contextmanager
+    def _cursor(self, binary: bool = False):
+        """Check out a pooled connection and yield a dict-row cursor inside one transaction.
+        
+        The transaction is committed when the block exits normally and rolled
+        back on error, and the connection is always returned to the pool.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            # Inside transaction(): share its connection and leave the commit to it
+            with conn.cursor(row_factory=dict_row, binary=binary) as cursor:
+                yield cursor
+            return
+        
+        with self.pool.connection() as conn:
+            with conn.cursor(row_factory=dict_row, binary=binary) as cursor:
+                yield cursor
+    
+    @contextmanager
+    def transaction(self):
+        """Run every Database call made on this thread inside one transaction.
+        
+        The calls share a single pooled connection; the transaction commits when
+        the block exits normally and rolls back on error. Nested blocks become
+        savepoints.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            with conn.transaction():
+                yield conn
+            return
+        
+        with self.pool.connection() as conn:
+            self._local.conn = conn
+            try:
+                with conn.transaction():
+                    yield conn
+            finally:
+                self._local.conn = None
+                # Rows cached during the block may have been rolled back, or
+                # re-read by other threads before its writes were committed
+                self._clear_lookup_cache(*list(self._lookup_caches))
+    
+    def _clear_lookup_cache(self, *names: str):
+        """Drop the cached rows of the named getter methods."""
+        with self._lookup_lock:
+            for name in names:
+                self._lookup_caches.pop(name, None)
+    
+    def _clear_lookups_written_by(self, query: str):
+        """Drop the cached rows of every getter whose table query writes to."""
+        written = {table.lower() for table in _WRITE_TARGET_RE.findall(query)}
+        if written:
+            self._clear_lookup_cache(*(name for name, table in _LOOKUP_TABLES.items() if table in written))
     
     def initialize_database(self):
         """Initialize the database by creating tables if they don't exist."""
-        schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
-        with open(schema_path, 'r') as f:
-            schema_sql = f.read()
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(schema_sql)
-            self.conn.commit()
-        except psycopg2.Error as e:
-            self.conn.rollback()
+            with self._cursor() as cursor:
+                # Pipeline mode sends every statement without waiting on each reply
+                with cursor.connection.pipeline():
+                    for stmt in _schema_statements():
+                        cursor.execute(stmt)
+        except psycopg.Error as e:
             print(f"Error initializing database: {e}")
             raise
     
-    def execute_query(self, query: str, params: tuple = (), fetch_all: bool = True):
+    def execute_query(self, query: str, params: tuple = (), fetch_all: bool = True, prepare: bool = None):
         """Execute a SQL query and return the results.
         
         Args:
             query: SQL query string
             params: Tuple of parameters for the query
             fetch_all: If True, fetch all results; if False, fetch one result
+            prepare: If True, prepare the statement on the connection right away;
+                by default psycopg prepares it automatically after a few executions
             
         Returns:
             List of dictionaries (rows) or a single row dictionary
         """
         try:
-            # Use DictCursor to return results as dictionaries
-            cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-            cursor.execute(query, params)
-            
-            if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
-                self.conn.commit()
-                if 'INSERT' in query.upper() and cursor.rowcount > 0:
-                    # For PostgreSQL, we need to use RETURNING clause to get the inserted ID
-                    # But if the query doesn't have it, we'll just return rowcount
-                    if 'RETURNING' in query.upper():
-                        row = cursor.fetchone()
-                        return row[0] if row else cursor.rowcount
+            # Binary results skip text parsing of numbers and timestamps
+            with self._cursor(binary=True) as cursor:
+                cursor.execute(query, params, prepare=prepare)
+                
+                op = query.lstrip()[:6].upper()
+                if op in ('INSERT', 'UPDATE', 'DELETE'):
+                    if op == 'INSERT' and cursor.rowcount > 0:
+                        # For PostgreSQL, we need to use RETURNING clause to get the inserted ID
+                        # But if the query doesn't have it, we'll just return rowcount
+                        if _RETURNING_RE.search(query):
+                            row = cursor.fetchone()
+                            return next(iter(row.values())) if row else cursor.rowcount
+                        return cursor.rowcount
                     return cursor.rowcount
-                return cursor.rowcount
+                
+                if fetch_all:
+                    return cursor.fetchall()
+                return cursor.fetchone()
             
-            if fetch_all:
-                rows = cursor.fetchall()
-                result = [dict(row) for row in rows]
-            else:
-                row = cursor.fetchone()
-                result = dict(row) if row else None
+        except psycopg.Error as e:
+            print(f"Database error: {e}")
+            raise
+        finally:
+            # After the commit (outside transaction()), so a concurrent getter cannot re-cache the old row
+            self._clear_lookups_written_by(query)
+    
+    def stream_query(self, query: str, params: tuple = (), chunk_size: int = 5000) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of a SELECT one at a time from a server-side cursor.
+        
+        Rows are fetched from the server chunk_size at a time, so memory stays
+        bounded however large the result is. The connection is held until the
+        generator is exhausted or closed.
+        
+        Args:
+            query: SQL query string
+            params: Tuple of parameters for the query
+            chunk_size: Rows fetched per round trip
+        """
+        conn = getattr(self._local, 'conn', None)
+        try:
+            with nullcontext(conn) if conn is not None else self.pool.connection() as conn:
+                # Named cursors live inside the surrounding transaction
+                with conn.cursor(f"stream_{uuid.uuid4().hex}", row_factory=dict_row, binary=True) as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute(query, params)
+                    yield from cursor
+        except psycopg.Error as e:
+            print(f"Database error: {e}")
+            raise
+    
+    def execute_many(self, query: str, rows: List[tuple], returning: bool = False):
+        """Execute a statement once per row, pipelined in a single round-trip.
+        
+        Args:
+            query: SQL statement with one set of %s placeholders for a row
+            rows: Sequence of parameter tuples, one per row
+            returning: If True, return the first column of each RETURNING row
+            
+        Returns:
+            List of returned values if returning is True, otherwise the number of rows
+        """
+        if not rows:
+            return [] if returning else 0
+        
+        try:
+            with self._cursor() as cursor:
+                cursor.executemany(query, rows, returning=returning)
+                if not returning:
+                    return len(rows)
                 
-            return result
+                # Each row's RETURNING output is a separate result set
+                returned = []
+                while True:
+                    row = cursor.fetchone()
+                    if row:
+                        returned.append(next(iter(row.values())))
+                    if not cursor.nextset():
+                        break
+                return returned
             
-        except psycopg2.Error as e:
-            self.conn.rollback()
+        except psycopg.Error as e:
             print(f"Database error: {e}")
             raise
+        finally:
+            self._clear_lookups_written_by(query)
     
     # Teacher methods
     def add_teacher(self, first_name: str, last_name: str, email: str) -> int:
         """Add a new teacher to the database."""
-        query = """
-        INSERT INTO teachers (first_name, last_name, email)
-        VALUES (%s, %s, %s)
-        RETURNING teacher_id
+        return self.execute_query(_Q_ADD_TEACHER, (first_name, last_name, email))
+    
+    def add_teachers(self, teachers: List[Tuple[str, str, str]]) -> List[int]:
+        """Add several teachers in one round-trip.
+        
+        Args:
+            teachers: (first_name, last_name, email) tuples
+            
+        Returns:
+            The new teacher IDs, in input order
         """
-        return self.execute_query(query, (first_name, last_name, email))
+        return self.execute_many(_Q_ADD_TEACHER, teachers, returning=True)
     
+    def upsert_teacher_by_email(self, first_name: str, last_name: str, email: str) -> int:
+        """Return the ID of the teacher with this email, adding them if missing."""
+        row = self.execute_query(_Q_UPSERT_TEACHER_BY_EMAIL,
+                                 {'first_name': first_name, 'last_name': last_name, 'email': email},
+                                 fetch_all=False, prepare=True)
+        return row['teacher_id']
+    
+    @cached_method('teachers')
     def get_teacher(self, teacher_id: int) -> Optional[Dict]:
         """Get a teacher by ID."""
-        query = "SELECT * FROM teachers WHERE teacher_id = %s"
-        return self.execute_query(query, (teacher_id,), fetch_all=False)
+        return self.execute_query(_Q_GET_TEACHER, (teacher_id,), fetch_all=False, prepare=True)
     
     # Student methods
     def add_student(self, first_name: str, last_name: str, email: str, date_of_birth: str = None) -> int:
         """Add a new student to the database."""
-        query = """
-        INSERT INTO students (first_name, last_name, email, date_of_birth)
-        VALUES (%s, %s, %s, %s)
-        RETURNING student_id
+        return self.execute_query(_Q_ADD_STUDENT, (first_name, last_name, email, date_of_birth), prepare=True)
+    
+    def add_students(self, students: List[Tuple[str, str, str, Optional[str]]]) -> List[int]:
+        """Add several students in one round-trip.
+        
+        Args:
+            students: (first_name, last_name, email, date_of_birth) tuples
+            
+        Returns:
+            The new student IDs, in input order
         """
-        return self.execute_query(query, (first_name, last_name, email, date_of_birth))
+        return self.execute_many(_Q_ADD_STUDENT, students, returning=True)
     
+    def upsert_student_by_email(self, first_name: str, last_name: str, email: str,
+                                date_of_birth: str = None) -> int:
+        """Return the ID of the student with this email, adding them if missing."""
+        row = self.execute_query(_Q_UPSERT_STUDENT_BY_EMAIL,
+                                 {'first_name': first_name, 'last_name': last_name, 'email': email,
+                                  'date_of_birth': date_of_birth},
+                                 fetch_all=False, prepare=True)
+        return row['student_id']
+    
+    @cached_method('students')
     def get_student(self, student_id: int) -> Optional[Dict]:
         """Get a student by ID."""
-        query = "SELECT * FROM students WHERE student_id = %s"
-        return self.execute_query(query, (student_id,), fetch_all=False)
+        return self.execute_query(_Q_GET_STUDENT, (student_id,), fetch_all=False, prepare=True)
     
     # Class methods
     def add_class(self, class_name: str, academic_year: str, semester: str, description: str = None) -> int:
         """Add a new class to the database."""
-        query = """
-        INSERT INTO classes (class_name, academic_year, semester, description)
-        VALUES (%s, %s, %s, %s)
-        RETURNING class_id
-        """
-        return self.execute_query(query, (class_name, academic_year, semester, description))
+        return self.execute_query(_Q_ADD_CLASS, (class_name, academic_year, semester, description))
     
+    @cached_method('classes')
     def get_class(self, class_id: int) -> Optional[Dict]:
         """Get a class by ID."""
-        query = "SELECT * FROM classes WHERE class_id = %s"
-        return self.execute_query(query, (class_id,), fetch_all=False)
+        return self.execute_query(_Q_GET_CLASS, (class_id,), fetch_all=False, prepare=True)
     
     # Subject methods
     def add_subject(self, subject_name: str, subject_code: str = None, description: str = None) -> int:
         """Add a new subject to the database."""
-        query = """
-        INSERT INTO subjects (subject_name, subject_code, description)
-        VALUES (%s, %s, %s)
-        RETURNING subject_id
-        """
-        return self.execute_query(query, (subject_name, subject_code, description))
+        return self.execute_query(_Q_ADD_SUBJECT, (subject_name, subject_code, description))
     
+    @cached_method('subjects')
     def get_subject(self, subject_id: int) -> Optional[Dict]:
         """Get a subject by ID."""
-        query = "SELECT * FROM subjects WHERE subject_id = %s"
-        return self.execute_query(query, (subject_id,), fetch_all=False)
+        return self.execute_query(_Q_GET_SUBJECT, (subject_id,), fetch_all=False, prepare=True)
     
     # Enrollment and assignment methods
     def enroll_student_in_class(self, student_id: int, class_id: int, enrollment_date: str = None) -> int:
@@ -161,77 +501,44 @@ class Database:
         if not enrollment_date:
             enrollment_date = datetime.now().strftime('%Y-%m-%d')
             
-        query = """
-        INSERT INTO student_class (student_id, class_id, enrollment_date)
-        VALUES (%s, %s, %s)
-        RETURNING student_id
-        """
-        return self.execute_query(query, (student_id, class_id, enrollment_date))
+        return self.execute_query(_Q_ENROLL_STUDENT, (student_id, class_id, enrollment_date))
     
     def assign_teacher_to_class_subject(self, teacher_id: int, subject_id: int, class_id: int, 
                                       academic_year: str, semester: str) -> int:
         """Assign a teacher to teach a subject in a specific class, year, and semester."""
-        query = """
-        INSERT INTO teacher_subject_class (teacher_id, subject_id, class_id, academic_year, semester)
-        VALUES (%s, %s, %s, %s, %s)
-        RETURNING teacher_id
-        """
-        return self.execute_query(query, (teacher_id, subject_id, class_id, academic_year, semester))
+        return self.execute_query(_Q_ASSIGN_TEACHER, (teacher_id, subject_id, class_id, academic_year, semester))
     
     # Performance methods
     def record_student_performance(self, student_id: int, subject_id: int, class_id: int, 
                                   academic_year: str, semester: str, score: float = None, 
                                   grade: str = None, attendance: int = None) -> int:
         """Record or update a student's performance in a subject."""
-        query = """
-        INSERT INTO student_subject_performance 
-        (student_id, subject_id, class_id, academic_year, semester, score, grade, attendance)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT(student_id, subject_id, class_id, academic_year, semester)
-        DO UPDATE SET 
-            score = COALESCE(EXCLUDED.score, student_subject_performance.score),
-            grade = COALESCE(EXCLUDED.grade, student_subject_performance.grade),
-            attendance = COALESCE(EXCLUDED.attendance, student_subject_performance.attendance),
-            updated_at = CURRENT_TIMESTAMP
-        RETURNING student_id
+        return self.execute_query(_Q_RECORD_PERFORMANCE, (student_id, subject_id, class_id, academic_year,
+                                                          semester, score, grade, attendance),
+                                  prepare=True)
+    
+    def record_student_performances(self, records: List[tuple]) -> int:
+        """Record or update many performance rows in one pipelined round-trip.
+        
+        Args:
+            records: (student_id, subject_id, class_id, academic_year, semester,
+                     score, grade, attendance) tuples; each key may appear only
+                     once per call
+            
+        Returns:
+            The number of rows written
         """
-        return self.execute_query(query, (student_id, subject_id, class_id, academic_year, 
-                                         semester, score, grade, attendance))
+        return self.execute_many(_Q_UPSERT_PERFORMANCE, records)
     
     # Reporting methods
     def get_student_report(self, student_id: int) -> Dict[str, Any]:
-        """Get a comprehensive report for a student."""
-        # Get student info
-        student = self.get_student(student_id)
-        if not student:
-            return None
-        
-        # Get all classes the student is enrolled in
-        query = """
-        SELECT c.class_id, c.class_name, sc.enrollment_date, sc.status
-        FROM student_class sc
-        JOIN classes c ON sc.class_id = c.class_id
-        WHERE sc.student_id = %s
-        """
-        classes = self.execute_query(query, (student_id,))
-        
-        # Get performance in each subject
-        query = """
-        SELECT s.subject_id, s.subject_name, sp.score, sp.grade, sp.attendance,
-               c.class_name, sp.academic_year, sp.semester
-        FROM student_subject_performance sp
-        JOIN subjects s ON sp.subject_id = s.subject_id
-        JOIN classes c ON sp.class_id = c.class_id
-        WHERE sp.student_id = %s
-        ORDER BY sp.academic_year DESC, sp.semester
-        """
-        performance = self.execute_query(query, (student_id,))
+        """Get a comprehensive report for a student.
         
-        return {
-            'student': dict(student),
-            'classes': classes,
-            'performance': performance
-        }
+        The whole report is built as one JSON object by Postgres in a single
+        round-trip, so dates and timestamps come back as ISO strings.
+        """
+        row = self.execute_query(_Q_STUDENT_REPORT, (student_id,), fetch_all=False, prepare=True)
+        return row['report'] if row else None
 
 # Singleton instance
 db = Database()
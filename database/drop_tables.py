@@ -6,45 +6,17 @@ This is useful for resetting the database to a clean state.
 
 import os
 import sys
-import psycopg2
-from urllib.parse import urlparse
-from dotenv import load_dotenv
+from psycopg import sql
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from _conn import open_conn, release_conn
+
 def drop_tables():
     """Drop all tables from the Supabase database"""
     try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Get database connection string
-        db_url = os.getenv("DATABASE_URL")
-        if not db_url:
-            print("DATABASE_URL environment variable not set")
-            sys.exit(1)
-        
-        # Parse the connection string
-        parsed_url = urlparse(db_url)
-        
-        # Extract connection parameters
-        dbname = parsed_url.path[1:]  # Remove leading slash
-        user = parsed_url.username
-        password = parsed_url.password
-        host = parsed_url.hostname
-        port = parsed_url.port
-        
-        # Connect to the database
-        print(f"Connecting to database at {host}:{port}...")
-        conn = psycopg2.connect(
-            dbname=dbname,
-            user=user,
-            password=password,
-            host=host,
-            port=port
-        )
-        conn.autocommit = True  # Auto-commit each statement
+        conn = open_conn()
         
         # Create a cursor
         cur = conn.cursor()
@@ -57,11 +29,12 @@ def drop_tables():
             trigger_rec RECORD;
         BEGIN
             FOR trigger_rec IN (
-                SELECT trigger_name, event_object_table
-                FROM information_schema.triggers
-                WHERE trigger_schema = 'public'
+                SELECT tgname, tgrelid::regclass AS table_name
+                FROM pg_trigger
+                WHERE NOT tgisinternal
+                  AND tgrelid IN (SELECT oid FROM pg_class WHERE relnamespace = 'public'::regnamespace)
             ) LOOP
-                EXECUTE 'DROP TRIGGER IF EXISTS ' || trigger_rec.trigger_name || ' ON ' || trigger_rec.event_object_table || ' CASCADE;';
+                EXECUTE 'DROP TRIGGER IF EXISTS ' || quote_ident(trigger_rec.tgname) || ' ON ' || trigger_rec.table_name || ' CASCADE;';
             END LOOP;
         END $$;
         """
@@ -73,8 +46,8 @@ def drop_tables():
         
         # Get a list of all tables
         cur.execute("""
-            SELECT tablename FROM pg_tables 
-            WHERE schemaname = 'public'
+            SELECT relname FROM pg_class
+            WHERE relkind IN ('r', 'p') AND relnamespace = 'public'::regnamespace
         """)
         tables = [row[0] for row in cur.fetchall()]
         
@@ -84,20 +57,21 @@ def drop_tables():
         # Disable foreign key checks
         cur.execute("SET session_replication_role = 'replica';")
         
-        # Drop each table
-        for table in tables:
-            print(f"Dropping table: {table}")
+        # Drop every table in a single statement
+        if tables:
             try:
-                cur.execute(f'DROP TABLE IF EXISTS "{table}" CASCADE;')
+                cur.execute(sql.SQL("DROP TABLE IF EXISTS {} CASCADE;").format(
+                    sql.SQL(", ").join(map(sql.Identifier, tables))
+                ))
             except Exception as e:
-                print(f"Error dropping table {table}: {e}")
+                print(f"Error dropping tables: {e}")
         
         # Re-enable foreign key checks
         cur.execute("SET session_replication_role = 'origin';")
         
         # Close the connection
         cur.close()
-        conn.close()
+        release_conn(conn)
         
         print("\nAll tables dropped successfully!")
         
@@ -108,35 +82,23 @@ def drop_tables():
 def truncate_tables_reset_identity():
     """Truncate all public tables and restart all SERIAL / IDENTITY sequences."""
     try:
-        load_dotenv()
-        db_url = os.getenv("DATABASE_URL")
-        if not db_url:
-            print("DATABASE_URL not set")
-            sys.exit(1)
-        parsed_url = urlparse(db_url)
-        conn = psycopg2.connect(
-            dbname=parsed_url.path[1:],
-            user=parsed_url.username,
-            password=parsed_url.password,
-            host=parsed_url.hostname,
-            port=parsed_url.port,
-        )
-        conn.autocommit = True
+        conn = open_conn()
         cur = conn.cursor()
 
         cur.execute("""
-            SELECT tablename FROM pg_tables 
-            WHERE schemaname = 'public'
+            SELECT relname FROM pg_class
+            WHERE relkind IN ('r', 'p') AND relnamespace = 'public'::regnamespace
         """)
         tables = [row[0] for row in cur.fetchall()]
         if not tables:
             print("No tables found to truncate.")
             return
         print(f"Truncating tables and resetting sequences: {', '.join(tables)}")
-        for table in tables:
-            cur.execute(f'TRUNCATE TABLE "{table}" RESTART IDENTITY CASCADE;')
+        cur.execute(sql.SQL("TRUNCATE TABLE {} RESTART IDENTITY CASCADE;").format(
+            sql.SQL(", ").join(map(sql.Identifier, tables))
+        ))
         cur.close()
-        conn.close()
+        release_conn(conn)
         print("All tables truncated and sequences reset!\n")
     except Exception as e:
         print(f"Error truncating tables: {e}")
@@ -1,72 +1,87 @@
 import os
 import sys
-import psycopg2
-from urllib.parse import urlparse
-from dotenv import load_dotenv
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from _conn import open_conn, release_conn
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(__file__), 'sample_data')
+
+# Bytes of CSV sent to the server per COPY write
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Tables loaded straight from CSV, parents first
+BASE_TABLES = [
+    ('teachers', 'first_name, last_name, email'),
+    ('students', 'first_name, last_name, email, date_of_birth'),
+    ('classes', 'class_name, academic_year, semester, description'),
+    ('subjects', 'subject_name, subject_code, description'),
+]
+
+# Relationship CSVs name their rows by natural key; they are copied into a
+# temp staging table and resolved to IDs with a join
+LINK_TABLES = [
+    ('student_class', """
+        email VARCHAR(255), class_name VARCHAR(100), enrollment_date DATE, status VARCHAR(20)
+    """, """
+        INSERT INTO student_class (student_id, class_id, enrollment_date, status)
+        SELECT s.student_id, c.class_id, e.enrollment_date, e.status
+        FROM staging_student_class e
+        JOIN students s ON s.email = e.email
+        JOIN classes c ON c.class_name = e.class_name
+    """),
+    ('teacher_subject_class', """
+        teacher_email VARCHAR(255), subject_name VARCHAR(100), class_name VARCHAR(100),
+        academic_year VARCHAR(20), semester VARCHAR(20)
+    """, """
+        INSERT INTO teacher_subject_class (teacher_id, subject_id, class_id, academic_year, semester)
+        SELECT t.teacher_id, s.subject_id, c.class_id, a.academic_year, a.semester
+        FROM staging_teacher_subject_class a
+        JOIN teachers t ON t.email = a.teacher_email
+        JOIN subjects s ON s.subject_name = a.subject_name
+        JOIN classes c ON c.class_name = a.class_name
+    """),
+    ('student_subject_performance', """
+        student_email VARCHAR(255), subject_name VARCHAR(100), class_name VARCHAR(100),
+        academic_year VARCHAR(20), semester VARCHAR(20), score NUMERIC(5,2), grade VARCHAR(5),
+        attendance INTEGER
+    """, """
+        INSERT INTO student_subject_performance (student_id, subject_id, class_id, academic_year,
+                                                 semester, score, grade, attendance)
+        SELECT s.student_id, subj.subject_id, c.class_id, p.academic_year, p.semester,
+               p.score, p.grade, p.attendance
+        FROM staging_student_subject_performance p
+        JOIN students s ON s.email = p.student_email
+        JOIN subjects subj ON subj.subject_name = p.subject_name
+        JOIN classes c ON c.class_name = p.class_name
+    """),
+]
+
+def copy_csv(cur, csv_name, target):
+    """COPY sample_data/<csv_name>.csv into target, skipping the header row."""
+    with open(os.path.join(SAMPLE_DATA_DIR, f'{csv_name}.csv'), 'rb') as f:
+        with cur.copy(f"COPY {target} FROM STDIN WITH (FORMAT csv, HEADER true)") as copy:
+            for data in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+                copy.write(data)
+
+def copy_sample_data(cur):
+    """Load the sample CSVs with COPY, base tables before the tables that reference them."""
+    for table, columns in BASE_TABLES:
+        copy_csv(cur, table, f"{table} ({columns})")
+    
+    for table, staging_columns, insert_sql in LINK_TABLES:
+        cur.execute(f"CREATE TEMP TABLE staging_{table} ({staging_columns}) ON COMMIT DROP")
+        copy_csv(cur, table, f"staging_{table}")
+        cur.execute(insert_sql)
+
 def load_sample_data():
     """Load sample data into the database"""
     conn = None
     cur = None
     try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Read the sample data file
-        sample_data_path = os.path.join(os.path.dirname(__file__), 'sample_data.sql')
-        with open(sample_data_path, 'r') as f:
-            sample_data_sql = f.read()
-        
-        # Get database connection string
-        db_url = os.getenv("DATABASE_URL")
-        if not db_url:
-            print("DATABASE_URL environment variable not set")
-            sys.exit(1)
-        
-        # Parse the connection string
-        parsed_url = urlparse(db_url)
-        
-        # Extract connection parameters
-        dbname = parsed_url.path[1:]  # Remove leading slash
-        user = parsed_url.username
-        password = parsed_url.password
-        host = parsed_url.hostname
-        port = parsed_url.port
-        
-        # Connect to the database
-        print(f"Connecting to database at {host}:{port}...")
-        print(f"Database: {dbname}")
-        
-        try:
-            conn = psycopg2.connect(
-                dbname=dbname,
-                user=user,
-                password=password,
-                host=host,
-                port=port
-            )
-        except Exception as e:
-            print(f"Connection error: {e}")
-            # Try with sslmode=require
-            print("Trying with sslmode=require...")
-            try:
-                conn = psycopg2.connect(
-                    dbname=dbname,
-                    user=user,
-                    password=password,
-                    host=host,
-                    port=port,
-                    sslmode='require'
-                )
-            except Exception as e:
-                print(f"Connection error with sslmode=require: {e}")
-                raise
-        
-        # Turn off autocommit to use transaction
-        conn.autocommit = False
+        # Check out a transactional connection from the shared pool
+        conn = open_conn(autocommit=False)
         
         # Create a cursor
         cur = conn.cursor()
@@ -88,9 +103,9 @@ def load_sample_data():
             print("Tables may not exist yet. Make sure to run init_db.py first.")
             return
         
-        # Execute entire SQL script in a single command
+        # Bulk-load every CSV with COPY inside one transaction
         try:
-            cur.execute(sample_data_sql)
+            copy_sample_data(cur)
             conn.commit()
             print("\nSample data inserted successfully!")
         except Exception as e:
@@ -102,13 +117,13 @@ def load_sample_data():
         tables = ['teachers', 'students', 'classes', 'subjects', 
                  'student_class', 'teacher_subject_class', 'student_subject_performance']
         print("\nVerifying data insertion:")
-        for table in tables:
-            try:
-                cur.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cur.fetchone()[0]
+        try:
+            # One round-trip for all the counts
+            cur.execute("SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {table})" for table in tables))
+            for table, count in zip(tables, cur.fetchone()):
                 print(f"Table {table}: {count} records")
-            except Exception as e:
-                print(f"Error checking table {table}: {e}")
+        except Exception as e:
+            print(f"Error checking tables: {e}")
         
     except Exception as e:
         print(f"Error loading sample data: {e}")
@@ -120,8 +135,8 @@ def load_sample_data():
         if conn:
             if cur:
                 cur.close()
-            conn.close()
-            print("\nDatabase connection closed.")
+            release_conn(conn)
+            print("\nDatabase connection released.")
 
 if __name__ == "__main__":
     print("Loading sample data into database...")
@@ -98,37 +98,38 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- Triggers to automatically update the updated_at column
-CREATE TRIGGER update_teachers_modtime
+-- (OR REPLACE, PostgreSQL 14+, keeps re-running this file against an existing database safe)
+CREATE OR REPLACE TRIGGER update_teachers_modtime
     BEFORE UPDATE ON teachers
     FOR EACH ROW
     EXECUTE FUNCTION update_modified_column();
 
-CREATE TRIGGER update_students_modtime
+CREATE OR REPLACE TRIGGER update_students_modtime
     BEFORE UPDATE ON students
     FOR EACH ROW
     EXECUTE FUNCTION update_modified_column();
 
-CREATE TRIGGER update_classes_modtime
+CREATE OR REPLACE TRIGGER update_classes_modtime
     BEFORE UPDATE ON classes
     FOR EACH ROW
     EXECUTE FUNCTION update_modified_column();
 
-CREATE TRIGGER update_subjects_modtime
+CREATE OR REPLACE TRIGGER update_subjects_modtime
     BEFORE UPDATE ON subjects
     FOR EACH ROW
     EXECUTE FUNCTION update_modified_column();
 
-CREATE TRIGGER update_student_class_modtime
+CREATE OR REPLACE TRIGGER update_student_class_modtime
     BEFORE UPDATE ON student_class
     FOR EACH ROW
     EXECUTE FUNCTION update_modified_column();
 
-CREATE TRIGGER update_teacher_subject_class_modtime
+CREATE OR REPLACE TRIGGER update_teacher_subject_class_modtime
     BEFORE UPDATE ON teacher_subject_class
     FOR EACH ROW
     EXECUTE FUNCTION update_modified_column();
 
-CREATE TRIGGER update_student_subject_performance_modtime
+CREATE OR REPLACE TRIGGER update_student_subject_performance_modtime
     BEFORE UPDATE ON student_subject_performance
     FOR EACH ROW
     EXECUTE FUNCTION update_modified_column();
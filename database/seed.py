@@ -1,6 +1,6 @@
 import os
 import sys
-from datetime import datetime, date
+from datetime import date
 from dotenv import load_dotenv
 
 # Add the project root to the Python path
@@ -8,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import Supabase client
 from config.supabase import get_supabase
+from _conn import open_conn, release_conn
 
 def create_tables():
     """Create necessary tables if they don't exist"""
@@ -67,103 +68,110 @@ def create_tables():
     }, {'primaryKey': ['teacher_id', 'class_id']})
     print("Created class_teacher table")
 
-def seed_database():
-    """Seed the database with example data"""
-    supabase = get_supabase()
-    
-    # Insert teachers
-    teachers = [
-        {'first_name': 'John', 'last_name': 'Smith', 'email': 'john.smith@example.com'},
-        {'first_name': 'Sarah', 'last_name': 'Johnson', 'email': 'sarah.j@example.com'}
-    ]
-    
-    inserted_teachers = []
-    for teacher in teachers:
-        # Check if teacher already exists
-        existing = supabase.table('teachers').select('*').eq('email', teacher['email']).execute()
-        if existing.data:
-            inserted_teachers.append(existing.data[0])
-            print(f"Teacher {teacher['email']} already exists")
-        else:
-            result = supabase.table('teachers').insert(teacher).execute()
-            inserted_teachers.append(result.data[0])
-            print(f"Added teacher: {teacher['email']}")
-    
-    # Insert students
-    students = [
-        {'first_name': 'Alice', 'last_name': 'Johnson', 'email': 'alice.j@example.com', 'date_of_birth': '2010-05-15'},
-        {'first_name': 'Bob', 'last_name': 'Williams', 'email': 'bob.w@example.com', 'date_of_birth': '2010-08-22'},
-        {'first_name': 'Charlie', 'last_name': 'Brown', 'email': 'charlie.b@example.com', 'date_of_birth': '2011-02-10'},
-        {'first_name': 'Diana', 'last_name': 'Miller', 'email': 'diana.m@example.com', 'date_of_birth': '2010-11-30'},
-        {'first_name': 'Ethan', 'last_name': 'Davis', 'email': 'ethan.d@example.com', 'date_of_birth': '2011-01-20'}
-    ]
+def insert_returning(cur, query, rows):
+    """Run query once per row, pipelined, and return the first column of every RETURNING row."""
+    if not rows:
+        return []
     
-    inserted_students = []
-    for student in students:
-        # Check if student already exists
-        existing = supabase.table('students').select('*').eq('email', student['email']).execute()
-        if existing.data:
-            inserted_students.append(existing.data[0])
-            print(f"Student {student['email']} already exists")
-        else:
-            result = supabase.table('students').insert(student).execute()
-            inserted_students.append(result.data[0])
-            print(f"Added student: {student['email']}")
+    cur.executemany(query, rows, returning=True)
     
-    # Insert a class
-    class_data = {
-        'class_name': 'Mathematics 101',
-        'academic_year': '2024-2025',
-        'semester': 'Spring',
-        'description': 'Introductory Mathematics for Beginners'
-    }
-    
-    # Check if class already exists
-    existing_class = supabase.table('classes').select('*').eq('class_name', class_data['class_name']).execute()
-    if existing_class.data:
-        class_record = existing_class.data[0]
-        print(f"Class {class_data['class_name']} already exists")
-    else:
-        class_result = supabase.table('classes').insert(class_data).execute()
-        class_record = class_result.data[0]
-        print(f"Added class: {class_data['class_name']}")
-    
-    # Enroll all students in the class
-    for student in inserted_students:
-        enrollment = {
-            'student_id': student['student_id'],
-            'class_id': class_record['class_id'],
-            'enrollment_date': date.today().isoformat(),
-            'status': 'active'
-        }
-        # Check if enrollment exists
-        existing_enrollment = supabase.table('student_class')\
-            .select('*')\
-            .eq('student_id', student['student_id'])\
-            .eq('class_id', class_record['class_id'])\
-            .execute()
-        
-        if not existing_enrollment.data:
-            supabase.table('student_class').insert(enrollment).execute()
-            print(f"Enrolled student {student['first_name']} in class {class_record['class_name']}")
+    # Each row's RETURNING output is a separate result set
+    returned = []
+    while True:
+        row = cur.fetchone()
+        if row:
+            returned.append(row[0])
+        if not cur.nextset():
+            break
+    return returned
+
+def seed_database():
+    """Seed the database with example data"""
+    conn = open_conn()
     
-    # Assign teachers to the class
-    for teacher in inserted_teachers:
-        assignment = {
-            'teacher_id': teacher['teacher_id'],
-            'class_id': class_record['class_id'],
-            'is_primary': True if teacher['email'] == 'john.smith@example.com' else False
-        }
-        # Check if assignment exists
-        existing_assignment = supabase.table('class_teacher')\
-            .select('*')\
-            .eq('teacher_id', teacher['teacher_id'])\
-            .eq('class_id', class_record['class_id'])\
-            .execute()
-        
-        if not existing_assignment.data:
-            supabase.table('class_teacher').insert(assignment).execute()
-            print(f"Assigned teacher {teacher['first_name']} to class {class_record['class_name']}")
+    try:
+        # Commits when the block exits normally, rolls back on error
+        with conn.transaction(), conn.cursor() as cur:
+            # Insert teachers
+            teachers = [
+                {'first_name': 'John', 'last_name': 'Smith', 'email': 'john.smith@example.com'},
+                {'first_name': 'Sarah', 'last_name': 'Johnson', 'email': 'sarah.j@example.com'}
+            ]
+            
+            # ON CONFLICT replaces the per-row existence check; RETURNING only
+            # yields the rows that were actually inserted
+            added = insert_returning(cur, """
+                INSERT INTO teachers (first_name, last_name, email) VALUES (%s, %s, %s)
+                ON CONFLICT (email) DO NOTHING
+                RETURNING email
+            """, [(t['first_name'], t['last_name'], t['email']) for t in teachers])
+            print(f"Added {len(added)} teachers, {len(teachers) - len(added)} already existed")
+            
+            cur.execute("SELECT teacher_id, email FROM teachers WHERE email = ANY(%s)",
+                        ([t['email'] for t in teachers],))
+            teacher_ids = {email: teacher_id for teacher_id, email in cur.fetchall()}
+            
+            # Insert students
+            students = [
+                {'first_name': 'Alice', 'last_name': 'Johnson', 'email': 'alice.j@example.com', 'date_of_birth': '2010-05-15'},
+                {'first_name': 'Bob', 'last_name': 'Williams', 'email': 'bob.w@example.com', 'date_of_birth': '2010-08-22'},
+                {'first_name': 'Charlie', 'last_name': 'Brown', 'email': 'charlie.b@example.com', 'date_of_birth': '2011-02-10'},
+                {'first_name': 'Diana', 'last_name': 'Miller', 'email': 'diana.m@example.com', 'date_of_birth': '2010-11-30'},
+                {'first_name': 'Ethan', 'last_name': 'Davis', 'email': 'ethan.d@example.com', 'date_of_birth': '2011-01-20'}
+            ]
+            
+            added = insert_returning(cur, """
+                INSERT INTO students (first_name, last_name, email, date_of_birth) VALUES (%s, %s, %s, %s)
+                ON CONFLICT (email) DO NOTHING
+                RETURNING email
+            """, [(s['first_name'], s['last_name'], s['email'], s['date_of_birth']) for s in students])
+            print(f"Added {len(added)} students, {len(students) - len(added)} already existed")
+            
+            cur.execute("SELECT student_id, email FROM students WHERE email = ANY(%s)",
+                        ([s['email'] for s in students],))
+            student_ids = {email: student_id for student_id, email in cur.fetchall()}
+            
+            # Insert a class
+            class_data = {
+                'class_name': 'Mathematics 101',
+                'academic_year': '2024-2025',
+                'semester': 'Spring',
+                'description': 'Introductory Mathematics for Beginners'
+            }
+            
+            # class_name is not unique, so the class keeps its lookup
+            cur.execute("SELECT class_id FROM classes WHERE class_name = %s LIMIT 1", (class_data['class_name'],))
+            row = cur.fetchone()
+            if row:
+                class_id = row[0]
+                print(f"Class {class_data['class_name']} already exists")
+            else:
+                cur.execute("""
+                    INSERT INTO classes (class_name, academic_year, semester, description)
+                    VALUES (%(class_name)s, %(academic_year)s, %(semester)s, %(description)s)
+                    RETURNING class_id
+                """, class_data)
+                class_id = cur.fetchone()[0]
+                print(f"Added class: {class_data['class_name']}")
+            
+            # Enroll all students in the class
+            enrolled = insert_returning(cur, """
+                INSERT INTO student_class (student_id, class_id, enrollment_date, status) VALUES (%s, %s, %s, %s)
+                ON CONFLICT (student_id, class_id) DO NOTHING
+                RETURNING student_id
+            """, [(student_id, class_id, date.today(), 'active') for student_id in student_ids.values()])
+            print(f"Enrolled {len(enrolled)} students in class {class_data['class_name']}")
+            
+            # Assign teachers to the class
+            assigned = insert_returning(cur, """
+                INSERT INTO class_teacher (teacher_id, class_id, is_primary) VALUES (%s, %s, %s)
+                ON CONFLICT (teacher_id, class_id) DO NOTHING
+                RETURNING teacher_id
+            """, [(teacher_id, class_id, email == 'john.smith@example.com')
+                  for email, teacher_id in teacher_ids.items()])
+            print(f"Assigned {len(assigned)} teachers to class {class_data['class_name']}")
+    finally:
+        release_conn(conn)
     
     print("\nDatabase seeding completed successfully!")
 
@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for the Flask backend.
+
+Usage:
+    gunicorn -c gunicorn.conf.py src.archive.backend_server:app
+    GUNICORN_WORKER_CLASS=gthread gunicorn -c gunicorn.conf.py src.simple_backend:app
+
+The main backend is I/O bound and runs on gevent workers. The OCR backend
+(simple_backend) runs tesseract and PIL on a thread pool; gevent's
+monkey-patching would turn those threads into greenlets sharing one OS
+thread, so one OCR upload would stall every request on the worker. Run it
+on gthread workers instead.
+"""
+
+import multiprocessing
+import os
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+
+if worker_class == 'gevent':
+    # Patch sockets/ssl before anything else imports them
+    from gevent import monkey
+    monkey.patch_all()
+    
+    # google.generativeai talks gRPC, whose C core blocks the gevent hub unless it
+    # is told to cooperate; without this one slow Gemini call (e.g.
+    # /api/generate-quiz) stalls every other request on the worker
+    try:
+        from grpc.experimental import gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+    except ImportError:
+        pass
+
+bind = f"{os.environ.get('FLASK_HOST', '0.0.0.0')}:{os.environ.get('PORT', os.environ.get('FLASK_PORT', '5000'))}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_connections = 1000
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))  # gthread workers only
+timeout = 120
+
+# Postgres connections all workers may hold together; the server default
+# max_connections is 100, so leave headroom for scripts and admin sessions.
+# Each worker's pool gets an equal share unless POSTGRES_POOL_MAX is set.
+DB_CONNECTION_BUDGET = int(os.environ.get('POSTGRES_CONNECTION_BUDGET', '80'))
+os.environ.setdefault('POSTGRES_POOL_MAX', str(max(2, DB_CONNECTION_BUDGET // workers)))
@@ -3,15 +3,19 @@ OCR to Google Classroom uploader module.
 Converts OCR extracted educational content to Google Classroom materials.
 """
 
-import json
-import sys
+import orjson
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 
-# Add src to path to import classroom_handler
-sys.path.append(str(Path(__file__).parent.parent / "src"))
-from classroom_handler import create_quiz_assignment, get_classroom_service, list_courses
+from src.classroom_handler import classroom_http, create_course_work_async, create_quiz_assignment, get_classroom_service, list_courses
+
+# Google's batch endpoint accepts up to 50 calls per Classroom batch request
+BATCH_MAX_REQUESTS = 50
+
+# Default number of files uploaded concurrently by upload_from_files
+UPLOAD_MAX_WORKERS = 8
 
 
 class OCRClassroomUploader:
@@ -51,20 +55,20 @@ class OCRClassroomUploader:
         subject = data.get('subject', 'General')
         topics = data.get('topics', [])
         
-        # Build description from topics
-        description = f"**Subject:** {subject}\n\n"
+        # Build description from topics, one line per entry
+        lines = [f"**Subject:** {subject}", ""]
         
         if topics:
-            description += "**Key Topics:**\n"
-            for i, topic in enumerate(topics, 1):
-                description += f"{i}. {topic}\n"
-            description += "\n"
+            lines.append("**Key Topics:**")
+            lines.extend(f"{i}. {topic}" for i, topic in enumerate(topics, 1))
+            lines.append("")
         
         content_type = data.get('content_type', 'Notes')
         difficulty = data.get('difficulty_level', 'Not specified')
         
-        description += f"**Content Type:** {content_type}\n"
-        description += f"**Difficulty Level:** {difficulty}\n"
+        lines.append(f"**Content Type:** {content_type}")
+        lines.append(f"**Difficulty Level:** {difficulty}")
+        description = "\n".join(lines) + "\n"
         
         return {
             'title': f"{title} - {subject}",
@@ -80,14 +84,15 @@ class OCRClassroomUploader:
         questions = data.get('questions', [])
         answers = data.get('answers', [])
         
-        # Build quiz description
-        description = f"**Quiz: {title}**\n\n"
+        # Build quiz description, one line per entry
+        lines = [f"**Quiz: {title}**", ""]
         
         for i, question in enumerate(questions, 1):
-            description += f"**Question {i}:** {question}\n"
+            lines.append(f"**Question {i}:** {question}")
             if i <= len(answers) and answers[i-1]:
-                description += f"**Answer:** {answers[i-1]}\n"
-            description += "\n"
+                lines.append(f"**Answer:** {answers[i-1]}")
+            lines.append("")
+        description = "\n".join(lines) + "\n"
         
         return {
             'title': f"Quiz: {title}",
@@ -103,13 +108,12 @@ class OCRClassroomUploader:
         subject = data.get('subject', 'General')
         topics = data.get('topics', [])
         
-        description = f"**Assignment: {title}**\n\n"
-        description += f"**Subject:** {subject}\n\n"
+        lines = [f"**Assignment: {title}**", "", f"**Subject:** {subject}", ""]
         
         if topics:
-            description += "**Topics to Cover:**\n"
-            for topic in topics:
-                description += f"• {topic}\n"
+            lines.append("**Topics to Cover:**")
+            lines.extend(f"• {topic}" for topic in topics)
+        description = "\n".join(lines) + "\n"
         
         return {
             'title': f"{title} - {subject}",
@@ -145,35 +149,117 @@ class OCRClassroomUploader:
             }
         
         try:
-            # Convert OCR data to classroom format
-            assignment_data = self.convert_ocr_to_assignment(ocr_data, assignment_type)
+            assignment_data = self._build_assignment(ocr_data, assignment_type, due_date_days)
             
-            # Add due date if specified
-            if due_date_days:
-                due_date = datetime.now() + timedelta(days=due_date_days)
-                assignment_data['dueDate'] = {
-                    'year': due_date.year,
-                    'month': due_date.month,
-                    'day': due_date.day
-                }
+            # Create the assignment in Google Classroom on a checked-out connection
+            with classroom_http() as http:
+                assignment = self.service.courses().courseWork().create(
+                    courseId=course_id,
+                    body=assignment_data
+                ).execute(http=http)
             
-            # Create the assignment in Google Classroom
-            assignment = self.service.courses().courseWork().create(
-                courseId=course_id,
-                body=assignment_data
-            ).execute()
+            return self._upload_result(course_id, assignment, assignment_type)
             
+        except Exception as e:
             return {
-                "success": True,
-                "assignment_id": assignment.get('id'),
-                "course_id": course_id,
-                "title": assignment.get('title'),
-                "state": assignment.get('state'),
-                "max_points": assignment.get('maxPoints'),
-                "alternate_link": assignment.get('alternateLink'),
-                "assignment_type": assignment_type,
-                "message": f"Successfully uploaded {assignment_type} '{assignment.get('title')}' to course {course_id}"
+                "success": False,
+                "error": f"Failed to upload to classroom: {str(e)}",
+                "course_id": course_id
             }
+    
+    def upload_batch(
+        self,
+        course_id: str,
+        ocr_data_list: List[Dict[str, Any]],
+        assignment_type: str = "material",
+        due_date_days: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload several OCR extraction results to Google Classroom in batched requests.
+
+        The creates are sent as multipart batch requests of up to
+        BATCH_MAX_REQUESTS calls each, so N assignments cost one round trip per
+        batch instead of one per assignment. A single item falls back to
+        upload_to_classroom.
+
+        Args:
+            course_id: Google Classroom course ID
+            ocr_data_list: OCR extraction results to upload
+            assignment_type: Type of assignment (material, quiz, assignment)
+            due_date_days: Days from now for due date (optional)
+
+        Returns:
+            One result dictionary per input, in input order
+        """
+        if len(ocr_data_list) <= 1:
+            return [
+                self.upload_to_classroom(course_id, ocr_data, assignment_type, due_date_days)
+                for ocr_data in ocr_data_list
+            ]
+
+        if not self.service:
+            return [{
+                "success": False,
+                "error": "Could not connect to Google Classroom service"
+            } for _ in ocr_data_list]
+
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def on_create(request_id, response, exception):
+            if exception is not None:
+                results[request_id] = {
+                    "success": False,
+                    "error": f"Failed to upload to classroom: {str(exception)}",
+                    "course_id": course_id
+                }
+            else:
+                results[request_id] = self._upload_result(course_id, response, assignment_type)
+
+        course_work = self.service.courses().courseWork()
+        for start in range(0, len(ocr_data_list), BATCH_MAX_REQUESTS):
+            batch = self.service.new_batch_http_request(callback=on_create)
+            for i, ocr_data in enumerate(ocr_data_list[start:start + BATCH_MAX_REQUESTS], start):
+                try:
+                    assignment_data = self._build_assignment(ocr_data, assignment_type, due_date_days)
+                except Exception as e:
+                    on_create(str(i), None, e)
+                    continue
+                batch.add(course_work.create(courseId=course_id, body=assignment_data), request_id=str(i))
+
+            try:
+                with classroom_http() as http:
+                    batch.execute(http=http)
+            except Exception as e:
+                # The whole batch failed in transit; mark whatever did not get a reply
+                for i in range(start, min(start + BATCH_MAX_REQUESTS, len(ocr_data_list))):
+                    results.setdefault(str(i), {
+                        "success": False,
+                        "error": f"Failed to upload to classroom: {str(e)}",
+                        "course_id": course_id
+                    })
+
+        return [results[str(i)] for i in range(len(ocr_data_list))]
+
+    async def upload_to_classroom_async(
+        self, 
+        course_id: str,
+        ocr_data: Dict[str, Any],
+        assignment_type: str = "material",
+        due_date_days: Optional[int] = None,
+        client=None
+    ) -> Dict[str, Any]:
+        """
+        Upload OCR extracted content to Google Classroom without blocking the event loop.
+        
+        Uses the Classroom REST API. Pass a client from new_async_client() so
+        concurrent uploads share its keep-alive connections instead of each
+        opening its own. Otherwise takes the same arguments and returns the
+        same result as upload_to_classroom.
+        """
+        try:
+            assignment_data = self._build_assignment(ocr_data, assignment_type, due_date_days)
+            assignment = await create_course_work_async(course_id, assignment_data, client=client)
+            return self._upload_result(course_id, assignment, assignment_type)
             
         except Exception as e:
             return {
@@ -182,6 +268,41 @@ class OCRClassroomUploader:
                 "course_id": course_id
             }
     
+    def _build_assignment(
+        self,
+        ocr_data: Dict[str, Any],
+        assignment_type: str,
+        due_date_days: Optional[int]
+    ) -> Dict[str, Any]:
+        """Build the courseWork body for an upload, including the optional due date."""
+        # Convert OCR data to classroom format
+        assignment_data = self.convert_ocr_to_assignment(ocr_data, assignment_type)
+        
+        # Add due date if specified
+        if due_date_days:
+            due_date = datetime.now() + timedelta(days=due_date_days)
+            assignment_data['dueDate'] = {
+                'year': due_date.year,
+                'month': due_date.month,
+                'day': due_date.day
+            }
+        
+        return assignment_data
+    
+    def _upload_result(self, course_id: str, assignment: Dict[str, Any], assignment_type: str) -> Dict[str, Any]:
+        """Summarise a created courseWork item as an upload result."""
+        return {
+            "success": True,
+            "assignment_id": assignment.get('id'),
+            "course_id": course_id,
+            "title": assignment.get('title'),
+            "state": assignment.get('state'),
+            "max_points": assignment.get('maxPoints'),
+            "alternate_link": assignment.get('alternateLink'),
+            "assignment_type": assignment_type,
+            "message": f"Successfully uploaded {assignment_type} '{assignment.get('title')}' to course {course_id}"
+        }
+    
     def upload_from_file(
         self,
         course_id: str, 
@@ -203,8 +324,7 @@ class OCRClassroomUploader:
         """
         try:
             # Load processed OCR data
-            with open(processed_file_path, 'r', encoding='utf-8') as f:
-                ocr_data = json.load(f)
+            ocr_data = orjson.loads(Path(processed_file_path).read_bytes())
             
             # Upload to classroom
             result = self.upload_to_classroom(
@@ -223,6 +343,29 @@ class OCRClassroomUploader:
                 "error": f"Failed to load file {processed_file_path}: {str(e)}"
             }
     
+    def upload_from_files(
+        self,
+        course_id: str,
+        processed_file_paths: List[str],
+        assignment_type: str = "material",
+        due_date_days: Optional[int] = None,
+        max_workers: int = UPLOAD_MAX_WORKERS
+    ) -> List[Dict[str, Any]]:
+        """
+        Load and upload several processed OCR files concurrently.
+        
+        Each file is read and uploaded by upload_from_file on a worker thread,
+        so file reads and Classroom round trips overlap.
+        
+        Returns:
+            One result dictionary per file, in input order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(
+                lambda path: self.upload_from_file(course_id, path, assignment_type, due_date_days),
+                processed_file_paths
+            ))
+    
     def get_available_courses(self) -> List[Dict[str, Any]]:
         """Get list of available Google Classroom courses."""
         return list_courses()
\ No newline at end of file
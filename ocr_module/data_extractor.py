@@ -2,21 +2,254 @@
 Data extraction module using Gemini LLM with LangGraph for processing OCR text.
 """
 
-import json
+import orjson
 import time
-import yaml
+import asyncio
+import functools
 import logging
-from typing import TypedDict, Dict, Any, Optional, List
+import sqlite3
+import hashlib
+import tempfile
+from contextlib import closing
+from typing import TYPE_CHECKING, TypedDict, Dict, Any, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime
 import os
 
-import google.generativeai as genai
-from langgraph.graph import StateGraph, END
-
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
-from src.gemini_handler import MODEL_NAME, generate_node, build_graph
+from src.gemini_handler import MODEL_NAME, acquire_slot, async_slot
+
+# yaml, google.generativeai and langgraph are imported where they are first
+# needed, so importing the OCR package does not pay for them up front
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+
+# Gemini Batch API job polling
+BATCH_POLL_INTERVAL = 30  # seconds
+BATCH_TERMINAL_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+# On-disk cache of Gemini extraction replies. It holds OCR'd worksheet text,
+# so it lives in one fixed, git-ignored place (the repo root unless
+# GEMINI_CACHE_DIR is set) rather than wherever the process was started
+RESPONSE_CACHE_PATH = Path(
+    os.environ.get("GEMINI_CACHE_DIR", Path(__file__).resolve().parent.parent / ".gemini_cache")
+) / "responses.sqlite3"
+RESPONSE_CACHE_TTL = int(os.environ.get("GEMINI_CACHE_TTL", 7 * 86400))  # seconds
+
+
+class _ResponseCache:
+    """Content-addressed SQLite cache of raw Gemini replies, keyed by model, instructions and text."""
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, raw_response TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per call keeps this safe across threads
+        return sqlite3.connect(self.path, timeout=10)
+    
+    @staticmethod
+    def key(extraction_type: str, text: str) -> str:
+        generation_config = orjson.dumps(_generation_config(extraction_type), option=orjson.OPT_SORT_KEYS).decode()
+        material = f"{MODEL_NAME}\0{_extraction_instruction(extraction_type)}\0{generation_config}\0{text}"
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT raw_response FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, raw_response: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, raw_response, expires_at) VALUES (?, ?, ?)",
+                (key, raw_response, time.time() + RESPONSE_CACHE_TTL)
+            )
+
+
+@functools.lru_cache(maxsize=None)
+def _load_model(config_path: str):
+    """Read the API key and build the Gemini model once per config file.
+    
+    Returns:
+        (api_key, model) tuple shared by every DataExtractor on that config
+    """
+    import yaml
+    import google.generativeai as genai
+    
+    with open(config_path, "r") as file:
+        config = yaml.safe_load(file)
+    api_key = config["google_ai_studio_api_key"]
+    genai.configure(api_key=api_key)
+    return api_key, genai.GenerativeModel(MODEL_NAME)
+
+
+_INSTRUCTION_PREFIX = """
+Extract structured information from the OCR text in the user message.
+Return ONLY valid JSON format.
+"""
+
+# Fixed per-type instructions, sent as the system instruction so each call
+# carries only the OCR text
+EXTRACTION_INSTRUCTIONS = {
+    "educational_content": _INSTRUCTION_PREFIX + """
+Extract educational content with these keys:
+{
+    "title": "string - main title or heading",
+    "subject": "string - academic subject",
+    "topics": ["list of key topics/concepts"],
+    "questions": ["list of questions found"],
+    "answers": ["list of answers if present"],
+    "difficulty_level": "string - beginner/intermediate/advanced",
+    "content_type": "string - worksheet/quiz/assignment/notes",
+    "page_number": "string - if present"
+}
+""",
+    "form_data": _INSTRUCTION_PREFIX + """
+Extract form data with these keys:
+{
+    "form_type": "string - type of form",
+    "fields": {
+        "field_name": "field_value"
+    },
+    "checkboxes": ["list of checked items"],
+    "dates": ["list of dates found"],
+    "signatures": ["list of signature fields"]
+}
+""",
+    "student_work": _INSTRUCTION_PREFIX + """
+Extract student work information:
+{
+    "student_name": "string - if present",
+    "assignment_title": "string",
+    "subject": "string",
+    "responses": ["list of student answers"],
+    "score": "string - if graded",
+    "feedback": "string - teacher comments if present",
+    "date": "string - if present"
+}
+""",
+    "general": _INSTRUCTION_PREFIX + """
+Extract any structured information you can identify:
+{
+    "main_content": "string - primary content",
+    "key_points": ["list of important points"],
+    "entities": {
+        "names": ["person names"],
+        "dates": ["dates found"],
+        "numbers": ["important numbers"],
+        "locations": ["places mentioned"]
+    },
+    "document_type": "string - best guess of document type"
+}
+""",
+}
+
+def _extraction_instruction(extraction_type: str) -> str:
+    """Return the system instruction for a type; unknown types get the general one."""
+    return EXTRACTION_INSTRUCTIONS.get(extraction_type, EXTRACTION_INSTRUCTIONS["general"])
+
+# ──────────────────── Gemini JSON-mode response schemas ────────────────
+_STRING = {"type": "STRING"}
+_STRING_LIST = {"type": "ARRAY", "items": _STRING}
+
+# form_data's "fields" is a free-form name -> value map, which response
+# schemas cannot express, so that type uses JSON mode without a schema
+EXTRACTION_SCHEMAS = {
+    "educational_content": {
+        "type": "OBJECT",
+        "properties": {
+            "title": _STRING,
+            "subject": _STRING,
+            "topics": _STRING_LIST,
+            "questions": _STRING_LIST,
+            "answers": _STRING_LIST,
+            "difficulty_level": {"type": "STRING", "enum": ["beginner", "intermediate", "advanced"]},
+            "content_type": _STRING,
+            "page_number": _STRING,
+        },
+        "required": ["title", "subject", "topics", "questions", "answers", "difficulty_level", "content_type"],
+    },
+    "form_data": None,
+    "student_work": {
+        "type": "OBJECT",
+        "properties": {
+            "student_name": _STRING,
+            "assignment_title": _STRING,
+            "subject": _STRING,
+            "responses": _STRING_LIST,
+            "score": _STRING,
+            "feedback": _STRING,
+            "date": _STRING,
+        },
+        "required": ["assignment_title", "subject", "responses"],
+    },
+    "general": {
+        "type": "OBJECT",
+        "properties": {
+            "main_content": _STRING,
+            "key_points": _STRING_LIST,
+            "entities": {
+                "type": "OBJECT",
+                "properties": {
+                    "names": _STRING_LIST,
+                    "dates": _STRING_LIST,
+                    "numbers": _STRING_LIST,
+                    "locations": _STRING_LIST,
+                },
+            },
+            "document_type": _STRING,
+        },
+        "required": ["main_content", "key_points", "entities", "document_type"],
+    },
+}
+
+def _generation_config(extraction_type: str) -> Dict[str, Any]:
+    """Return the JSON-mode generation config for a type; unknown types get the general one."""
+    schema = EXTRACTION_SCHEMAS.get(extraction_type, EXTRACTION_SCHEMAS["general"])
+    config = {"response_mime_type": "application/json"}
+    if schema is not None:
+        config["response_schema"] = schema
+    return config
+
+@functools.lru_cache(maxsize=None)
+def _load_extraction_model(config_path: str, extraction_type: str):
+    """Build the JSON-mode Gemini model for one extraction type once per config file."""
+    import google.generativeai as genai
+    
+    _load_model(config_path)  # configures the SDK key
+    return genai.GenerativeModel(
+        MODEL_NAME,
+        generation_config=_generation_config(extraction_type),
+        system_instruction=_extraction_instruction(extraction_type)
+    )
+
+
+def _dedupe_texts(texts: List[str]) -> Tuple[List[str], List[int]]:
+    """Collapse identical texts so each is extracted once.
+    
+    Returns:
+        (unique_texts, index_of) where texts[i] == unique_texts[index_of[i]]
+    """
+    slots: Dict[bytes, int] = {}
+    unique_texts: List[str] = []
+    index_of: List[int] = []
+    for text in texts:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        slot = slots.get(digest)
+        if slot is None:
+            slot = slots[digest] = len(unique_texts)
+            unique_texts.append(text)
+        index_of.append(slot)
+    return unique_texts, index_of
 
 
 class ExtractionState(TypedDict):
@@ -32,131 +265,104 @@ class ExtractionState(TypedDict):
 class DataExtractor:
     """Handles data extraction from OCR text using Gemini LLM and LangGraph."""
     
-    def __init__(self, config_path: str = "config.yml"):
+    def __init__(self, config_path: str = "config.yml", no_cache: bool = False):
         """
         Initialize data extractor.
         
         Args:
             config_path: Path to configuration file
+            no_cache: Always call Gemini instead of reusing cached replies for identical text
         """
         self.config_path = config_path
         self.logger = logging.getLogger(__name__)
+        self._cache = None if no_cache else _ResponseCache(RESPONSE_CACHE_PATH)
         self._setup_gemini()
-        self.graph = self._build_graph()
     
     def _setup_gemini(self):
         """Setup Gemini API configuration using existing handler."""
         try:
-            with open(self.config_path, "r") as file:
-                config = yaml.safe_load(file)
-            genai.configure(api_key=config["google_ai_studio_api_key"])
-            self.model = genai.GenerativeModel(MODEL_NAME)
+            self.api_key, self.model = _load_model(self.config_path)
         except Exception as e:
             self.logger.error(f"Failed to setup Gemini: {str(e)}")
             raise
     
     def _create_extraction_prompt(self, text: str, extraction_type: str) -> str:
-        """Create prompt for data extraction based on type."""
-        base_prompt = f"""
-        Extract structured information from the following OCR text. 
-        Return ONLY valid JSON format.
-        
-        OCR Text:
-        {text}
-        
-        """
-        
-        if extraction_type == "educational_content":
-            return base_prompt + """
-            Extract educational content with these keys:
-            {
-                "title": "string - main title or heading",
-                "subject": "string - academic subject",
-                "topics": ["list of key topics/concepts"],
-                "questions": ["list of questions found"],
-                "answers": ["list of answers if present"],
-                "difficulty_level": "string - beginner/intermediate/advanced",
-                "content_type": "string - worksheet/quiz/assignment/notes",
-                "page_number": "string - if present"
-            }
-            """
-        
-        elif extraction_type == "form_data":
-            return base_prompt + """
-            Extract form data with these keys:
-            {
-                "form_type": "string - type of form",
-                "fields": {
-                    "field_name": "field_value"
-                },
-                "checkboxes": ["list of checked items"],
-                "dates": ["list of dates found"],
-                "signatures": ["list of signature fields"]
-            }
-            """
-        
-        elif extraction_type == "student_work":
-            return base_prompt + """
-            Extract student work information:
-            {
-                "student_name": "string - if present",
-                "assignment_title": "string",
-                "subject": "string",
-                "responses": ["list of student answers"],
-                "score": "string - if graded",
-                "feedback": "string - teacher comments if present",
-                "date": "string - if present"
-            }
-            """
-        
-        else:  # general extraction
-            return base_prompt + """
-            Extract any structured information you can identify:
-            {
-                "main_content": "string - primary content",
-                "key_points": ["list of important points"],
-                "entities": {
-                    "names": ["person names"],
-                    "dates": ["dates found"],
-                    "numbers": ["important numbers"],
-                    "locations": ["places mentioned"]
-                },
-                "document_type": "string - best guess of document type"
-            }
-            """
+        """Create the per-call prompt; the fixed instructions live in the model's system instruction."""
+        return f"OCR Text:\n{text}"
+    
+    def _model_for(self, extraction_type: str):
+        """Return the model carrying the instructions for this extraction type."""
+        return _load_extraction_model(self.config_path, extraction_type)
     
     def _extract_node(self, state: ExtractionState) -> ExtractionState:
         """Extract structured data using Gemini with existing handler patterns."""
         try:
+            cached = self._cached_response(state)
+            if cached is not None:
+                return self._apply_response(state, cached)
+            
             prompt = self._create_extraction_prompt(state["raw_text"], state["extraction_type"])
             
-            time.sleep(1)  # Rate limiting (same as gemini_handler)
-            response = self.model.generate_content(prompt)
+            acquire_slot()  # Shared Gemini quota (same as gemini_handler)
+            response = self._model_for(state["extraction_type"]).generate_content(prompt)
+            self._apply_response(state, response.text)
+            self._store_response(state)
             
-            # Clean response text (remove markdown formatting if present)
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]  # Remove ```json
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]  # Remove ```
-            response_text = response_text.strip()
+        except Exception as e:
+            error_msg = f"Data extraction failed: {str(e)}"
+            self.logger.error(error_msg)
+            state["errors"].append(error_msg)
+            state["structured_data"] = {}
+            state["confidence_score"] = 0.0
+        
+        return state
+    
+    async def _extract_node_async(self, state: ExtractionState) -> ExtractionState:
+        """Async _extract_node; concurrent calls share gemini_handler's quota and concurrency limits."""
+        try:
+            cached = await asyncio.to_thread(self._cached_response, state)
+            if cached is not None:
+                return self._apply_response(state, cached)
             
-            # Parse JSON response
-            structured_data = json.loads(response_text)
+            prompt = self._create_extraction_prompt(state["raw_text"], state["extraction_type"])
             
-            state["structured_data"] = structured_data
-            state["raw_response"] = response.text  # Save original raw response
-            state["confidence_score"] = self._calculate_confidence(structured_data)
+            async with async_slot():
+                response = await self._model_for(state["extraction_type"]).generate_content_async(prompt)
+            self._apply_response(state, response.text)
+            await asyncio.to_thread(self._store_response, state)
             
-        except json.JSONDecodeError as e:
-            error_msg = f"Failed to parse Gemini response as JSON: {str(e)}"
+        except Exception as e:
+            error_msg = f"Data extraction failed: {str(e)}"
             self.logger.error(error_msg)
             state["errors"].append(error_msg)
             state["structured_data"] = {}
             state["confidence_score"] = 0.0
+        
+        return state
+    
+    def _cached_response(self, state: ExtractionState) -> Optional[str]:
+        """Return a cached raw reply for this text and type, if any."""
+        if self._cache is None:
+            return None
+        return self._cache.get(_ResponseCache.key(state["extraction_type"], state["raw_text"]))
+    
+    def _store_response(self, state: ExtractionState):
+        """Cache the raw reply of a successful extraction."""
+        if self._cache is not None and state["structured_data"]:
+            self._cache.set(_ResponseCache.key(state["extraction_type"], state["raw_text"]), state["raw_response"])
+    
+    def _apply_response(self, state: ExtractionState, response_text: str) -> ExtractionState:
+        """Parse a Gemini reply into the extraction state."""
+        try:
+            # JSON mode returns the bare object, with no markdown fences
+            structured_data = orjson.loads(response_text)
             
-        except Exception as e:
-            error_msg = f"Data extraction failed: {str(e)}"
+            state["structured_data"] = structured_data
+            state["raw_response"] = response_text  # Save original raw response
+            state["confidence_score"] = self._calculate_confidence(structured_data)
+            
+        except orjson.JSONDecodeError as e:
+            error_msg = f"Failed to parse Gemini response as JSON: {str(e)}"
             self.logger.error(error_msg)
             state["errors"].append(error_msg)
             state["structured_data"] = {}
@@ -193,19 +399,28 @@ class DataExtractor:
             return 0.0
         
         # Simple heuristic based on data completeness
-        filled_fields = sum(1 for v in data.values() if v)
         total_fields = len(data)
-        
-        base_confidence = filled_fields / total_fields if total_fields > 0 else 0.0
+        base_confidence = sum(map(bool, data.values())) / total_fields
         
         # Boost confidence if we have rich structured data
-        if isinstance(data, dict) and len(data) > 3:
+        if total_fields > 3:
             base_confidence = min(1.0, base_confidence * 1.2)
         
         return round(base_confidence, 2)
     
-    def _build_graph(self) -> StateGraph:
+    def _run_pipeline(self, state: ExtractionState) -> ExtractionState:
+        """Run the extract and validate steps directly, without LangGraph dispatch."""
+        return self._validate_node(self._extract_node(state))
+    
+    @functools.cached_property
+    def graph(self):
+        """The same pipeline as a compiled LangGraph, built on first access (e.g. for tracing)."""
+        return self._build_graph()
+    
+    def _build_graph(self) -> "StateGraph":
         """Build LangGraph for data extraction workflow using existing handler patterns."""
+        from langgraph.graph import StateGraph, END
+        
         graph = StateGraph(ExtractionState)
         
         # Add nodes
@@ -229,13 +444,17 @@ class DataExtractor:
             processed_dir.mkdir(exist_ok=True)
             
             # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             filename = f"{extraction_type}_{timestamp}.json"
             filepath = processed_dir / filename
             
-            # Save result to file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            # Write to a temp file and rename, so readers never see a partial file
+            tmp_path = filepath.with_suffix(".json.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
                 
             self.logger.info(f"Results saved to {filepath}")
             
@@ -257,34 +476,18 @@ class DataExtractor:
         Returns:
             Dictionary containing extracted structured data
         """
-        initial_state = ExtractionState(
-            raw_text=text,
-            extraction_type=extraction_type,
-            structured_data={},
-            raw_response="",
-            confidence_score=0.0,
-            errors=[]
-        )
+        initial_state = self._initial_state(text, extraction_type)
         
         try:
-            result = self.graph.invoke(initial_state)
+            result = self._run_pipeline(initial_state)
             
             # Save results to processed_data folder
-            processed_result = {
-                "structured_data": result["structured_data"],
-                "raw_response": result["raw_response"],
-                "confidence_score": result["confidence_score"],
-                "extraction_type": result["extraction_type"],
-                "errors": result["errors"],
-                "raw_text_length": len(text),
-                "timestamp": datetime.now().isoformat()
-            }
-            
+            processed_result = self._processed_result(result, text)
             self._save_result(processed_result, extraction_type)
             
             return processed_result
         except Exception as e:
-            self.logger.error(f"Graph execution failed: {str(e)}")
+            self.logger.error(f"Extraction pipeline failed: {str(e)}")
             return {
                 "structured_data": {},
                 "raw_response": "",
@@ -292,4 +495,154 @@ class DataExtractor:
                 "extraction_type": extraction_type,
                 "errors": [str(e)],
                 "raw_text_length": len(text)
-            }
\ No newline at end of file
+            }
+    
+    def _initial_state(self, text: str, extraction_type: str) -> ExtractionState:
+        """Return a fresh extraction state for one text."""
+        return ExtractionState(
+            raw_text=text,
+            extraction_type=extraction_type,
+            structured_data={},
+            raw_response="",
+            confidence_score=0.0,
+            errors=[]
+        )
+    
+    def _processed_result(self, result: ExtractionState, text: str) -> Dict[str, Any]:
+        """Shape a finished extraction state into the saved/returned result."""
+        return {
+            "structured_data": result["structured_data"],
+            "raw_response": result["raw_response"],
+            "confidence_score": result["confidence_score"],
+            "extraction_type": result["extraction_type"],
+            "errors": result["errors"],
+            "raw_text_length": len(text),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def extract_data_async(self, text: str, extraction_type: str = "general") -> Dict[str, Any]:
+        """
+        Async extract_data: runs the extract and validate steps without blocking the event loop.
+        
+        Args:
+            text: OCR text to process
+            extraction_type: Type of extraction (educational_content, form_data, student_work, general)
+            
+        Returns:
+            Dictionary containing extracted structured data
+        """
+        state = await self._extract_node_async(self._initial_state(text, extraction_type))
+        self._validate_node(state)
+        
+        processed_result = self._processed_result(state, text)
+        self._save_result(processed_result, extraction_type)
+        return processed_result
+    
+    async def extract_data_many(self, texts: List[str], extraction_type: str = "general") -> List[Dict[str, Any]]:
+        """Extract structured data from several texts concurrently, in input order.
+        
+        Repeated texts (e.g. identical scanned pages) are extracted once and
+        the result is copied to each of their positions.
+        """
+        unique_texts, index_of = _dedupe_texts(texts)
+        results = await asyncio.gather(*(self.extract_data_async(text, extraction_type) for text in unique_texts))
+        return [dict(results[i]) for i in index_of]
+    
+    def extract_data_batch(
+        self,
+        texts: List[str],
+        extraction_type: str = "general",
+        poll_interval: float = BATCH_POLL_INTERVAL
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract structured data from many texts with a single Gemini Batch job.
+        
+        Batch jobs are billed at half the interactive rate and run
+        asynchronously, so this suits bulk backfills rather than requests a
+        user is waiting on. The call blocks, polling every poll_interval
+        seconds, until the job finishes.
+        
+        Args:
+            texts: OCR texts to process
+            extraction_type: Type of extraction applied to every text
+            poll_interval: Seconds between job status checks
+            
+        Returns:
+            One result per text, in input order, shaped like extract_data's
+        """
+        from google import genai as genai_batch
+        from google.genai import types
+        
+        # Repeated texts are sent once and their result copied back out
+        texts, index_of = _dedupe_texts(texts)
+        states = [self._initial_state(text, extraction_type) for text in texts]
+        if not states:
+            return []
+        
+        try:
+            client = genai_batch.Client(api_key=self.api_key)
+            
+            # One JSONL request line per text, keyed by its index
+            with tempfile.NamedTemporaryFile("wb", suffix=".jsonl", delete=False) as f:
+                requests_path = f.name
+                instruction = _extraction_instruction(extraction_type)
+                generation_config = _generation_config(extraction_type)
+                for i, text in enumerate(texts):
+                    prompt = self._create_extraction_prompt(text, extraction_type)
+                    f.write(orjson.dumps({
+                        "key": str(i),
+                        "request": {
+                            "system_instruction": {"parts": [{"text": instruction}]},
+                            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                            "generation_config": generation_config
+                        }
+                    }) + b"\n")
+            
+            try:
+                uploaded = client.files.upload(
+                    file=requests_path,
+                    config=types.UploadFileConfig(display_name=f"extract-{extraction_type}", mime_type="jsonl")
+                )
+            finally:
+                os.unlink(requests_path)
+            
+            job = client.batches.create(
+                model=MODEL_NAME,
+                src=uploaded.name,
+                config={"display_name": f"extract-{extraction_type}-{len(texts)}"}
+            )
+            self.logger.info(f"Submitted Gemini batch job {job.name} for {len(texts)} texts")
+            
+            while job.state.name not in BATCH_TERMINAL_STATES:
+                time.sleep(poll_interval)
+                job = client.batches.get(name=job.name)
+            
+            if job.state.name != "JOB_STATE_SUCCEEDED":
+                raise RuntimeError(f"Batch job {job.name} ended in {job.state.name}")
+            
+            output = client.files.download(file=job.dest.file_name)
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                row = orjson.loads(line)
+                state = states[int(row["key"])]
+                
+                if "response" in row:
+                    parts = row["response"]["candidates"][0]["content"]["parts"]
+                    self._apply_response(state, "".join(part.get("text", "") for part in parts))
+                    self._validate_node(state)
+                else:
+                    state["errors"].append(f"Data extraction failed: {row.get('error')}")
+                
+        except Exception as e:
+            self.logger.error(f"Batch extraction failed: {str(e)}")
+            for state in states:
+                if not state["structured_data"]:
+                    state["errors"].append(str(e))
+        
+        results = []
+        for text, state in zip(texts, states):
+            processed_result = self._processed_result(state, text)
+            self._save_result(processed_result, extraction_type)
+            results.append(processed_result)
+        return [dict(results[i]) for i in index_of]
@@ -1,28 +1,213 @@
 """
-OCR Processor using pytesseract for text extraction from images.
+OCR Processor using tesseract for text extraction from images.
+
+When tesserocr is installed, recognition runs in-process on persistent
+PyTessBaseAPI instances; otherwise each call runs the tesseract CLI through
+pytesseract.
 """
 
 import os
+import queue
 import logging
-from typing import Optional, Dict, Any
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 from PIL import Image
 import pytesseract
 
+# Batches run one tesseract per core, so keep each one single-threaded rather
+# than letting its OpenMP threads oversubscribe the CPU. Must be set before
+# tesseract is loaded; an explicit setting wins.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+except ImportError:
+    PyTessBaseAPI = None
+
+# Column order of tesseract's TSV output (the rows image_to_data parses)
+_TSV_COLUMNS = [
+    'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+    'left', 'top', 'width', 'height', 'conf', 'text'
+]
+
+
+def _tsv_to_dict(tsv: str) -> Dict[str, List[Any]]:
+    """Parse tesseract TSV rows into the dict pytesseract's image_to_data returns."""
+    data: Dict[str, List[Any]] = {column: [] for column in _TSV_COLUMNS}
+    for line in tsv.splitlines():
+        if not line:
+            continue
+        cells = line.split('\t', len(_TSV_COLUMNS) - 1)
+        cells += [''] * (len(_TSV_COLUMNS) - len(cells))
+        for column, cell in zip(_TSV_COLUMNS[:-1], cells):
+            data[column].append(int(float(cell)))
+        data['text'].append(cells[-1])
+    return data
+
+
+# Separator tesseract writes after each page of a multi-image run
+_PAGE_SEPARATOR = '\x0c'
+
+
+# Contrast factor applied by preprocess_image (1.0 leaves the image unchanged)
+PREPROCESS_CONTRAST = 2.0
+
+# Encoder options for preprocessed images, by PIL format. The files are
+# read back once by tesseract, so fast zlib beats small files (level 6,
+# Pillow's default, spends most of preprocessing in deflate); PNG stays
+# lossless at any level.
+PREPROCESS_SAVE_OPTIONS = {
+    'PNG': {'compress_level': 1},
+}
+
+
+# Formats written without loss, whose saved pixels equal the in-memory image
+_LOSSLESS_FORMATS = {'PNG', 'TIFF', 'BMP'}
+
+# Decoded images kept for re-use; a full-page scan can take tens of MB
+DECODE_CACHE_SIZE = 8
+
+
+class _DecodedImageCache:
+    """Thread-safe LRU of fully decoded images, keyed by path and invalidated when the file changes."""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(path: str):
+        st = os.stat(path)
+        return os.path.abspath(path), st.st_mtime_ns, st.st_size
+    
+    def open(self, path: str) -> Image.Image:
+        """Return the decoded image at path, decoding it only on a miss. Callers must not modify it."""
+        key = self._key(path)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                return image
+        
+        with Image.open(path) as image:
+            image.load()
+        self._store(key, image)
+        return image
+    
+    def put(self, path: str, image: Image.Image):
+        """Record image as the decoded contents of the file just written at path."""
+        self._store(self._key(path), image)
+    
+    def _store(self, key, image: Image.Image):
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+_decoded_images = _DecodedImageCache(DECODE_CACHE_SIZE)
+
+
+@lru_cache(maxsize=None)
+def _contrast_table(mean: int, factor: float) -> Tuple[int, ...]:
+    """The contrast lookup table for one mean grey level; at most 256 per factor, so each is built once."""
+    return tuple(min(255, max(0, int(mean + factor * (level - mean)))) for level in range(256))
+
+
+def _contrast_lut(image: Image.Image, factor: float) -> Tuple[int, ...]:
+    """
+    Return the 256-entry table that ImageEnhance.Contrast(image).enhance(factor) applies to an L image.
+    
+    Each pixel is pushed away from the image's mean grey level, as Pillow's
+    blend with a flat mean-grey image does, but without allocating that image.
+    """
+    histogram = image.histogram()
+    total = sum(histogram)
+    mean = int(sum(level * count for level, count in enumerate(histogram)) / total + 0.5) if total else 0
+    return _contrast_table(mean, factor)
+
 
 class OCRProcessor:
-    """Handles OCR operations using pytesseract."""
+    """Handles OCR operations using tesseract."""
     
-    def __init__(self, tesseract_cmd: Optional[str] = None):
+    def __init__(self, tesseract_cmd: Optional[str] = None, lang: str = "eng"):
         """
         Initialize OCR processor.
         
         Args:
-            tesseract_cmd: Path to tesseract executable if not in PATH
+            tesseract_cmd: Path to tesseract executable if not in PATH (pytesseract fallback only)
+            lang: Tesseract language(s) to recognise
         """
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         
+        self.lang = lang
         self.logger = logging.getLogger(__name__)
+        
+        # Idle tesserocr engines. A PyTessBaseAPI is not thread-safe, so each
+        # call checks one out; the pool grows to the peak number of threads.
+        self._apis = queue.LifoQueue()
+        self._apis_lock = threading.Lock()
+        self._all_apis = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        """Release the tesseract engines held by this processor."""
+        with self._apis_lock:
+            apis, self._all_apis = self._all_apis, []
+        for api in apis:
+            api.End()
+        self._apis = queue.LifoQueue()
+    
+    @contextmanager
+    def _api(self):
+        """Check out a loaded PyTessBaseAPI, creating one if all are busy."""
+        try:
+            api = self._apis.get_nowait()
+        except queue.Empty:
+            api = PyTessBaseAPI(lang=self.lang, psm=PSM.AUTO)
+            with self._apis_lock:
+                self._all_apis.append(api)
+        try:
+            yield api
+        finally:
+            self._apis.put(api)
+    
+    def _image_to_string(self, image: Image.Image, config: Optional[str] = None) -> str:
+        """Recognise the text of an opened image."""
+        # Raw tesseract CLI options only apply to the pytesseract path
+        if PyTessBaseAPI is None or config:
+            if config:
+                return pytesseract.image_to_string(image, lang=self.lang, config=config)
+            return pytesseract.image_to_string(image, lang=self.lang)
+        
+        with self._api() as api:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+    
+    def _image_to_text_and_data(self, image: Image.Image) -> Tuple[str, Dict[str, List[Any]]]:
+        """Recognise an opened image; return its text and per-word boxes in image_to_data's dict format."""
+        if PyTessBaseAPI is None:
+            text = pytesseract.image_to_string(image, lang=self.lang)
+            data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+            return text.strip(), data
+        
+        # One recognition pass serves both the text and the TSV boxes
+        with self._api() as api:
+            api.SetImage(image)
+            return api.GetUTF8Text().strip(), _tsv_to_dict(api.GetTSVText(0))
     
     def extract_text(self, image_path: str, config: Optional[str] = None) -> str:
         """
@@ -43,24 +228,85 @@ class OCRProcessor:
             raise FileNotFoundError(f"Image file not found: {image_path}")
         
         try:
-            image = Image.open(image_path)
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Extract text using pytesseract
-            if config:
-                text = pytesseract.image_to_string(image, config=config)
-            else:
-                text = pytesseract.image_to_string(image)
-            
-            return text.strip()
+            return self.extract_text_from_image(_decoded_images.open(image_path), config)
             
         except Exception as e:
             self.logger.error(f"OCR processing failed for {image_path}: {str(e)}")
             raise
     
+    def extract_text_from_image(self, image: Image.Image, config: Optional[str] = None) -> str:
+        """
+        Extract text from an already opened image.
+        
+        Args:
+            image: PIL image to recognise
+            config: Optional tesseract config string
+            
+        Returns:
+            Extracted text from the image
+        """
+        # Convert to RGB if needed
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # Extract text using tesseract
+        return self._image_to_string(image, config).strip()
+    
+    def extract_many(self, image_paths: List[str]) -> List[str]:
+        """
+        Extract plain text from several images, starting tesseract once.
+        
+        With tesserocr the images run one after another on a single pooled
+        engine. Otherwise one tesseract process reads them all from a list
+        file and the output is split on its page separator; if the page count
+        does not match (e.g. a multi-frame TIFF) or the run fails, each image
+        is retried with extract_text.
+        
+        Args:
+            image_paths: Paths to the image files
+            
+        Returns:
+            Extracted text of each image, in input order
+            
+        Raises:
+            FileNotFoundError: If an image file doesn't exist
+        """
+        for image_path in image_paths:
+            if not os.path.exists(image_path):
+                raise FileNotFoundError(f"Image file not found: {image_path}")
+        
+        if not image_paths:
+            return []
+        
+        if PyTessBaseAPI is not None:
+            texts = []
+            with self._api() as api:
+                for image_path in image_paths:
+                    image = _decoded_images.open(image_path)
+                    api.SetImage(image.convert('RGB') if image.mode != 'RGB' else image)
+                    texts.append(api.GetUTF8Text().strip())
+            return texts
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as list_file:
+            list_file.writelines(f"{os.path.abspath(image_path)}\n" for image_path in image_paths)
+        try:
+            completed = subprocess.run(
+                [pytesseract.pytesseract.tesseract_cmd, list_file.name, 'stdout', '-l', self.lang, '--psm', '3'],
+                capture_output=True,
+                check=True
+            )
+            pages = completed.stdout.decode('utf-8').split(_PAGE_SEPARATOR)
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.logger.warning(f"Batched OCR failed, falling back to one image at a time: {str(e)}")
+            pages = []
+        finally:
+            os.unlink(list_file.name)
+        
+        # Every page, the last included, ends with a separator
+        if len(pages) != len(image_paths) + 1:
+            return [self.extract_text(image_path) for image_path in image_paths]
+        return [page.strip() for page in pages[:-1]]
+    
     def extract_data(self, image_path: str) -> Dict[str, Any]:
         """
         Extract structured data from image including text and metadata.
@@ -72,7 +318,9 @@ class OCRProcessor:
             Dictionary containing extracted text and metadata
         """
         try:
-            image = Image.open(image_path)
+            # Decode the file once (or reuse the cached decode); text and
+            # bounding boxes both come from this image
+            image = _decoded_images.open(image_path)
             
             # Get basic image info
             metadata = {
@@ -82,11 +330,8 @@ class OCRProcessor:
                 'mode': image.mode
             }
             
-            # Extract text
-            text = self.extract_text(image_path)
-            
-            # Get bounding box data
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+            rgb_image = image.convert('RGB') if image.mode != 'RGB' else image
+            text, data = self._image_to_text_and_data(rgb_image)
             
             return {
                 'text': text,
@@ -98,35 +343,49 @@ class OCRProcessor:
             self.logger.error(f"Data extraction failed for {image_path}: {str(e)}")
             raise
     
-    def preprocess_image(self, image_path: str, output_path: Optional[str] = None) -> str:
+    def preprocess_image(
+        self,
+        image_path: str,
+        output_path: Optional[str] = None,
+        output_format: Optional[str] = None
+    ) -> str:
         """
         Preprocess image for better OCR results.
         
         Args:
             image_path: Path to the input image
             output_path: Optional path for processed image
+            output_format: Optional file extension (e.g. "png") for the default
+                output path; by default the input's extension is kept
             
         Returns:
             Path to the processed image
         """
         try:
-            image = Image.open(image_path)
+            image = _decoded_images.open(image_path)
             
             # Convert to grayscale for better OCR
             if image.mode != 'L':
                 image = image.convert('L')
             
-            # Enhance contrast if needed
-            from PIL import ImageEnhance
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.0)
+            # Enhance contrast with a single lookup-table pass
+            image = image.point(_contrast_lut(image, PREPROCESS_CONTRAST))
             
             # Save processed image
             if not output_path:
                 name, ext = os.path.splitext(image_path)
+                if output_format:
+                    ext = f".{output_format.lower().lstrip('.')}"
                 output_path = f"{name}_processed{ext}"
             
-            image.save(output_path)
+            save_format = Image.registered_extensions().get(os.path.splitext(output_path)[1].lower())
+            image.save(output_path, **PREPROCESS_SAVE_OPTIONS.get(save_format, {}))
+            
+            # The OCR step reads this file next; hand it the image already in
+            # memory unless saving changed the pixels
+            if save_format in _LOSSLESS_FORMATS:
+                image.format = save_format
+                _decoded_images.put(output_path, image)
             return output_path
             
         except Exception as e:
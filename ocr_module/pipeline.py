@@ -2,13 +2,19 @@
 OCR Pipeline that combines image processing and data extraction.
 """
 
+import os
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
 from .ocr_processor import OCRProcessor
 from .data_extractor import DataExtractor
 
+# Images OCR'd at once by the async paths; tesseract is CPU-bound, so one per core
+OCR_CONCURRENCY = int(os.environ.get("OCR_CONCURRENCY", os.cpu_count() or 1))
+
 
 class OCRPipeline:
     """Complete OCR pipeline for processing images and extracting structured data."""
@@ -26,6 +32,10 @@ class OCRPipeline:
         try:
             self.ocr_processor = OCRProcessor(tesseract_cmd=tesseract_cmd)
             self.data_extractor = DataExtractor(config_path=config_path)
+            
+            # tesseract releases the GIL, so these workers OCR in parallel, each
+            # on an engine from the processor's pool (at most one per worker)
+            self._ocr_executor = ThreadPoolExecutor(max_workers=OCR_CONCURRENCY, thread_name_prefix="ocr")
         except Exception as e:
             self.logger.error(f"Failed to initialize OCR pipeline: {str(e)}")
             raise
@@ -69,70 +79,224 @@ class OCRPipeline:
                 extraction_type=extraction_type
             )
             
-            # Combine results
-            result = {
-                "image_path": image_path,
-                "preprocessed": preprocess,
-                "processed_image_path": processed_image_path if preprocess else None,
-                "ocr_result": ocr_result,
-                "extracted_data": extracted_data,
-                "pipeline_status": "success"
-            }
+            return self._success_result(image_path, preprocess, processed_image_path, ocr_result, extracted_data)
+            
+        except Exception as e:
+            return self._failure_result(image_path, preprocess, e)
+    
+    async def process_image_async(
+        self,
+        image_path: str,
+        extraction_type: str = "general",
+        preprocess: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Async process_image: tesseract runs on the pipeline's OCR workers and the Gemini step is awaited.
+        
+        Args:
+            image_path: Path to the image file
+            extraction_type: Type of data extraction to perform
+            preprocess: Whether to preprocess the image for better OCR
+            
+        Returns:
+            Dictionary shaped like process_image's result
+        """
+        try:
+            # Validate image path
+            if not Path(image_path).exists():
+                raise FileNotFoundError(f"Image file not found: {image_path}")
+            
+            loop = asyncio.get_running_loop()
+            
+            # Preprocess image if requested
+            processed_image_path = image_path
+            if preprocess:
+                self.logger.info(f"Preprocessing image: {image_path}")
+                processed_image_path = await loop.run_in_executor(
+                    self._ocr_executor, self.ocr_processor.preprocess_image, image_path
+                )
+            
+            # Extract text using OCR
+            self.logger.info(f"Extracting text from: {processed_image_path}")
+            ocr_result = await loop.run_in_executor(
+                self._ocr_executor, self.ocr_processor.extract_data, processed_image_path
+            )
+            
+            # Extract structured data using Gemini (rate-limited by the extractor)
+            self.logger.info(f"Extracting structured data using type: {extraction_type}")
+            extracted_data = await self.data_extractor.extract_data_async(
+                text=ocr_result["text"],
+                extraction_type=extraction_type
+            )
             
-            self.logger.info(f"Pipeline processing completed for: {image_path}")
-            return result
+            return self._success_result(image_path, preprocess, processed_image_path, ocr_result, extracted_data)
             
         except Exception as e:
-            error_msg = f"Pipeline processing failed for {image_path}: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                "image_path": image_path,
-                "preprocessed": preprocess,
-                "processed_image_path": None,
-                "ocr_result": {},
-                "extracted_data": {"errors": [error_msg]},
-                "pipeline_status": "failed",
-                "error": str(e)
-            }
+            return self._failure_result(image_path, preprocess, e)
+    
+    def _success_result(
+        self,
+        image_path: str,
+        preprocess: bool,
+        processed_image_path: str,
+        ocr_result: Dict[str, Any],
+        extracted_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Combine the OCR and extraction output of one image."""
+        result = {
+            "image_path": image_path,
+            "preprocessed": preprocess,
+            "processed_image_path": processed_image_path if preprocess else None,
+            "ocr_result": ocr_result,
+            "extracted_data": extracted_data,
+            "pipeline_status": "success"
+        }
+        
+        self.logger.info(f"Pipeline processing completed for: {image_path}")
+        return result
+    
+    def _failure_result(self, image_path: str, preprocess: bool, error: Exception) -> Dict[str, Any]:
+        """Describe an image whose processing failed."""
+        error_msg = f"Pipeline processing failed for {image_path}: {str(error)}"
+        self.logger.error(error_msg)
+        return {
+            "image_path": image_path,
+            "preprocessed": preprocess,
+            "processed_image_path": None,
+            "ocr_result": {},
+            "extracted_data": {"errors": [error_msg]},
+            "pipeline_status": "failed",
+            "error": str(error)
+        }
     
     def process_batch(
         self, 
         image_paths: List[str], 
         extraction_type: str = "general",
-        preprocess: bool = False
+        preprocess: bool = False,
+        batch_mode: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Process multiple images through the OCR pipeline.
         
+        Images are processed concurrently (see process_batch_async); this
+        blocking wrapper must not be called from a running event loop.
+        
         Args:
             image_paths: List of paths to image files
             extraction_type: Type of data extraction to perform
             preprocess: Whether to preprocess images for better OCR
+            batch_mode: OCR the images in shared tesseract runs, returning
+                text only; pass False for per-image metadata and bounding boxes
             
         Returns:
             List of dictionaries containing results for each image
         """
-        results = []
+        return asyncio.run(self.process_batch_async(image_paths, extraction_type, preprocess, batch_mode))
+    
+    async def process_batch_async(
+        self,
+        image_paths: List[str],
+        extraction_type: str = "general",
+        preprocess: bool = False,
+        batch_mode: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Process multiple images concurrently, in input order.
         
-        for i, image_path in enumerate(image_paths):
+        At most OCR_CONCURRENCY images are in tesseract at once; their Gemini
+        calls overlap under the extractor's own quota and concurrency limits.
+        In batch_mode each worker OCRs its share of the images with a single
+        OCRProcessor.extract_many call, so tesseract starts once per worker
+        rather than once per image, and ocr_result holds only the text.
+        """
+        if batch_mode:
+            return await self._process_batch_texts(image_paths, extraction_type, preprocess)
+        
+        async def run(i: int, image_path: str) -> Dict[str, Any]:
             self.logger.info(f"Processing image {i+1}/{len(image_paths)}: {image_path}")
             
             try:
-                result = self.process_image(
+                return await self.process_image_async(
                     image_path=image_path,
                     extraction_type=extraction_type,
                     preprocess=preprocess
                 )
-                results.append(result)
-                
             except Exception as e:
-                error_result = {
+                self.logger.error(f"Failed to process {image_path}: {str(e)}")
+                return {
                     "image_path": image_path,
                     "pipeline_status": "failed",
                     "error": str(e)
                 }
-                results.append(error_result)
-                self.logger.error(f"Failed to process {image_path}: {str(e)}")
+        
+        return await asyncio.gather(*(run(i, image_path) for i, image_path in enumerate(image_paths)))
+    
+    async def _process_batch_texts(
+        self,
+        image_paths: List[str],
+        extraction_type: str,
+        preprocess: bool
+    ) -> List[Dict[str, Any]]:
+        """process_batch_async in batch_mode: text-only OCR over shared tesseract runs."""
+        loop = asyncio.get_running_loop()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(image_paths)
+        
+        async def prepare(i: int, image_path: str) -> Optional[str]:
+            try:
+                if not Path(image_path).exists():
+                    raise FileNotFoundError(f"Image file not found: {image_path}")
+                if not preprocess:
+                    return image_path
+                self.logger.info(f"Preprocessing image: {image_path}")
+                return await loop.run_in_executor(
+                    self._ocr_executor, self.ocr_processor.preprocess_image, image_path
+                )
+            except Exception as e:
+                results[i] = self._failure_result(image_path, preprocess, e)
+                return None
+        
+        processed_paths = await asyncio.gather(*(prepare(i, path) for i, path in enumerate(image_paths)))
+        ready = [i for i, path in enumerate(processed_paths) if path is not None]
+        
+        async def ocr_one(i: int) -> Optional[str]:
+            try:
+                return await loop.run_in_executor(
+                    self._ocr_executor, self.ocr_processor.extract_text, processed_paths[i]
+                )
+            except Exception as e:
+                results[i] = self._failure_result(image_paths[i], preprocess, e)
+                return None
+        
+        async def ocr_chunk(chunk: List[int]) -> List[Optional[str]]:
+            self.logger.info(f"Extracting text from {len(chunk)} images in one tesseract run")
+            try:
+                return await loop.run_in_executor(
+                    self._ocr_executor, self.ocr_processor.extract_many, [processed_paths[i] for i in chunk]
+                )
+            except Exception as e:
+                # Find the image(s) that broke the run without failing the rest
+                self.logger.warning(f"Batched OCR failed, retrying images one by one: {str(e)}")
+                return await asyncio.gather(*(ocr_one(i) for i in chunk))
+        
+        # One contiguous chunk per OCR worker
+        size = -(-len(ready) // OCR_CONCURRENCY) or 1
+        chunks = [ready[start:start + size] for start in range(0, len(ready), size)]
+        chunk_texts = await asyncio.gather(*(ocr_chunk(chunk) for chunk in chunks))
+        texts = {
+            i: text
+            for chunk, chunk_text in zip(chunks, chunk_texts)
+            for i, text in zip(chunk, chunk_text)
+            if text is not None
+        }
+        
+        # Extract structured data using Gemini (rate-limited, identical texts once)
+        self.logger.info(f"Extracting structured data using type: {extraction_type}")
+        extracted = await self.data_extractor.extract_data_many(list(texts.values()), extraction_type)
+        for (i, text), extracted_data in zip(texts.items(), extracted):
+            results[i] = self._success_result(
+                image_paths[i], preprocess, processed_paths[i], {"text": text}, extracted_data
+            )
         
         return results
     
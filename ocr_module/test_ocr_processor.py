@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Checks for batched OCR through the tesseract CLI, with subprocess.run stubbed out
+"""
+
+import os
+import logging
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from ocr_module import ocr_processor
+from ocr_module.ocr_processor import OCRProcessor
+from ocr_module.pipeline import OCRPipeline
+
+@contextmanager
+def cli_backend(fake_run):
+    """Force the tesseract CLI path and route its subprocess.run calls to fake_run"""
+    saved_api, saved_run = ocr_processor.PyTessBaseAPI, ocr_processor.subprocess.run
+    ocr_processor.PyTessBaseAPI = None
+    ocr_processor.subprocess.run = fake_run
+    try:
+        yield
+    finally:
+        ocr_processor.PyTessBaseAPI, ocr_processor.subprocess.run = saved_api, saved_run
+
+@contextmanager
+def image_files(count):
+    """Yield paths of count placeholder image files; the stubbed runs never decode them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(count):
+            path = os.path.join(tmp, f"page{i}.png")
+            open(path, 'wb').close()
+            paths.append(path)
+        yield paths
+
+def tesseract_output(stdout):
+    """A stub subprocess.run whose tesseract run prints stdout"""
+    def run(args, **kwargs):
+        return subprocess.CompletedProcess(args, 0, stdout=stdout, stderr=b'')
+    return run
+
+def per_image_processor(fail=()):
+    """An OCRProcessor whose extract_text is stubbed, recording the images it was called with"""
+    processor = OCRProcessor()
+    processor.retried = []
+
+    def extract_text(image_path, config=None):
+        processor.retried.append(image_path)
+        if image_path in fail:
+            raise RuntimeError(f"cannot read {image_path}")
+        return f"text of {os.path.basename(image_path)}"
+
+    processor.extract_text = extract_text
+    return processor
+
+def test_list_file_run():
+    """All images go to one tesseract run through a list file of absolute paths"""
+    calls = []
+
+    def run(args, **kwargs):
+        with open(args[1], encoding='utf-8') as f:
+            calls.append((args, f.read()))
+        return subprocess.CompletedProcess(args, 0, stdout=b'one\x0ctwo\x0cthree\x0c', stderr=b'')
+
+    with image_files(3) as paths, cli_backend(run):
+        processor = per_image_processor()
+        assert processor.extract_many(paths) == ['one', 'two', 'three']
+        assert processor.retried == []
+
+    assert len(calls) == 1
+    args, list_file = calls[0]
+    assert args[0] == ocr_processor.pytesseract.pytesseract.tesseract_cmd
+    assert args[2:5] == ['stdout', '-l', 'eng']
+    assert list_file == ''.join(f"{os.path.abspath(path)}\n" for path in paths)
+    assert not os.path.exists(args[1])
+
+def test_output_split_on_page_separator():
+    """Each form-feed-terminated page becomes one stripped text, blank pages included"""
+    with image_files(3) as paths, cli_backend(tesseract_output(b'  first page\n\n\x0c\n\x0cthird\nline\n\x0c')):
+        assert per_image_processor().extract_many(paths) == ['first page', '', 'third\nline']
+
+def test_page_count_mismatch_falls_back():
+    """When the run yields a different number of pages, every image is OCR'd on its own"""
+    with image_files(2) as paths, cli_backend(tesseract_output(b'both pages as one\x0c')):
+        processor = per_image_processor()
+        assert processor.extract_many(paths) == ['text of page0.png', 'text of page1.png']
+        assert processor.retried == paths
+
+def test_failed_run_falls_back():
+    """A tesseract run that exits with an error falls back to one image at a time"""
+    def run(args, **kwargs):
+        raise subprocess.CalledProcessError(1, args, stderr=b'Error opening data file')
+
+    with image_files(2) as paths, cli_backend(run):
+        processor = per_image_processor()
+        assert processor.extract_many(paths) == ['text of page0.png', 'text of page1.png']
+        assert processor.retried == paths
+
+def test_batch_retries_images_one_by_one():
+    """If a batched run raises, process_batch retries its images singly and fails only the broken one"""
+    class Extractor:
+        async def extract_data_many(self, texts, extraction_type):
+            return [{'text': text} for text in texts]
+
+    def extract_many(image_paths):
+        raise RuntimeError("tesseract crashed")
+
+    with image_files(3) as paths:
+        processor = per_image_processor(fail={paths[1]})
+        processor.extract_many = extract_many
+
+        pipeline = OCRPipeline.__new__(OCRPipeline)
+        pipeline.logger = logging.getLogger(__name__)
+        pipeline.ocr_processor = processor
+        pipeline.data_extractor = Extractor()
+        pipeline._ocr_executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            results = pipeline.process_batch(paths)
+        finally:
+            pipeline._ocr_executor.shutdown()
+
+    assert sorted(processor.retried) == sorted(paths)
+    assert [result['pipeline_status'] for result in results] == ['success', 'failed', 'success']
+    assert results[0]['ocr_result'] == {'text': 'text of page0.png'}
+    assert results[2]['extracted_data'] == {'text': 'text of page2.png'}
+    assert 'cannot read' in results[1]['error']
+
+if __name__ == "__main__":
+    test_list_file_run()
+    test_output_split_on_page_separator()
+    test_page_count_mismatch_falls_back()
+    test_failed_run_falls_back()
+    test_batch_retries_images_one_by_one()
+    print("All OCR processor checks passed")
@@ -1,90 +1,117 @@
-from flask import Flask, jsonify, request
-import json
+from flask import Flask, Response, jsonify, request
+import orjson
 import os
 import sys
+import time
+import threading
 from pathlib import Path
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from database import db, init_db_with_config
-from src.config import POSTGRES_CONFIG, FLASK_DEBUG, FLASK_HOST, FLASK_PORT
+from src.config import POSTGRES_CONFIG, FLASK_DEBUG, FLASK_HOST, FLASK_PORT, QUIZ_SUBPROCESS
 import src.classroom_handler as classroom_handler
+from src.generate_quiz import generate_quiz_with_gemini
+from src.json_provider import ORJSONProvider
 from src.langgraph_agent import GoogleClassroomAgent
 
 # Initialize database with PostgreSQL configuration
 init_db_with_config(POSTGRES_CONFIG)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
+@app.errorhandler(Exception)
+def handle_exception(e):
+    """Return unhandled errors as a JSON 500 response."""
+    if isinstance(e, HTTPException):
+        return e
+    return jsonify({'error': str(e)}), 500
+
 LESSON_PLAN_PATH = os.path.join(os.path.dirname(__file__), 'data', 'lesson_plan.json')
 QUIZ_PATH = os.path.join(os.path.dirname(__file__), 'data', 'quiz.json')
+STUDENTS_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'students.json')
+
+# In-process cache of JSON data files: path -> (mtime_ns, size, data, body)
+_JSON_CACHE = {}
+
+def _read_cached(path):
+    """Return the cache entry for a data file, re-reading it only when it changes on disk."""
+    st = os.stat(path)
+    entry = _JSON_CACHE.get(path)
+    if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+        with open(path, 'rb') as f:
+            body = f.read()
+        data = orjson.loads(body)
+        entry = (st.st_mtime_ns, st.st_size, data, body)
+        _JSON_CACHE[path] = entry
+    return entry
+
+def _write_cached(path, data):
+    """Atomically write data as JSON and refresh its cache entry."""
+    body = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    # Unique per writer, so concurrent POSTs never interleave into one temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    Path(tmp_path).write_bytes(body)
+    os.replace(tmp_path, path)
+    st = os.stat(path)
+    _JSON_CACHE[path] = (st.st_mtime_ns, st.st_size, data, body)
+
+def _load_cached(path):
+    """Return a JSON response for a cached data file."""
+    return Response(_read_cached(path)[3], mimetype='application/json')
 
 @app.route('/api/lesson-plan', methods=['GET'])
 def get_lesson_plan():
-    try:
-        with open(LESSON_PLAN_PATH, 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return _load_cached(LESSON_PLAN_PATH)
 
 @app.route('/api/lesson-plan', methods=['POST'])
 def update_lesson_plan():
-    try:
-        data = request.json
-        with open(LESSON_PLAN_PATH, 'w') as f:
-            json.dump(data, f, indent=2)
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    _write_cached(LESSON_PLAN_PATH, request.get_json())
+    return jsonify({'success': True})
 
 @app.route('/api/quiz', methods=['GET'])
 def get_quiz():
-    try:
-        with open(QUIZ_PATH, 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return _load_cached(QUIZ_PATH)
 
 @app.route('/api/quiz', methods=['POST'])
 def update_quiz():
-    try:
-        data = request.json
-        with open(QUIZ_PATH, 'w') as f:
-            json.dump(data, f, indent=2)
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    _write_cached(QUIZ_PATH, request.get_json())
+    return jsonify({'success': True})
 
 @app.route('/api/generate-quiz', methods=['POST'])
 def generate_quiz():
-    try:
+    if QUIZ_SUBPROCESS:
+        # Run the generator in a separate interpreter when isolation is required
         import subprocess
         result = subprocess.run([
             'python', 'generate_quiz.py'
         ], capture_output=True, text=True)
-        if result.returncode == 0:
-            # Load the generated quiz
-            with open(QUIZ_PATH, 'r') as f:
-                quiz = json.load(f)
-            return jsonify({'success': True, 'quiz': quiz, 'llm_output': result.stdout})
-        else:
+        if result.returncode != 0:
             return jsonify({'error': f'LLM script failed: {result.stderr}'}), 500
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        quiz = _read_cached(QUIZ_PATH)[2]
+        return jsonify({'success': True, 'quiz': quiz, 'llm_output': result.stdout})
+
+    lesson_plan = _read_cached(LESSON_PLAN_PATH)[2]
+    llm_output = []
+    quiz = generate_quiz_with_gemini(lesson_plan, log=llm_output.append)
+    _write_cached(QUIZ_PATH, quiz)
+    return jsonify({'success': True, 'quiz': quiz, 'llm_output': ''.join(f'{line}\n' for line in llm_output)})
+
+# Serialized class list for the most recent course listing: (courses, body).
+# list_courses_async returns the same list object until its cache expires.
+_classes_body = (None, b'')
 
 @app.route('/api/google-classroom-classes', methods=['GET'])
-def google_classroom_classes():
+async def google_classroom_classes():
+    global _classes_body
     try:
-        # Import the classroom handler to use real Google Classroom API
-        import classroom_handler
-        
         # Get real classes from Google Classroom API
-        classes = classroom_handler.list_courses()
+        classes = await classroom_handler.list_courses_async()
         
         # If no classes are returned (e.g., authentication failed), return sample data
         if not classes:
@@ -95,18 +122,21 @@ def google_classroom_classes():
             ]
             return jsonify(sample_classes)
         
-        # Format the classes for the frontend
-        formatted_classes = []
-        for cls in classes:
-            formatted_classes.append({
-                "id": cls.get("id", "unknown"),
-                "name": cls.get("name", "Unnamed Class"),
-                "description": cls.get("description", ""),
-                "courseState": cls.get("courseState", ""),
-                "link": cls.get("alternateLink", "")
-            })
+        if _classes_body[0] is not classes:
+            # Format the classes for the frontend
+            formatted_classes = [
+                {
+                    "id": cls.get("id", "unknown"),
+                    "name": cls.get("name", "Unnamed Class"),
+                    "description": cls.get("description", ""),
+                    "courseState": cls.get("courseState", ""),
+                    "link": cls.get("alternateLink", "")
+                }
+                for cls in classes
+            ]
+            _classes_body = (classes, orjson.dumps(formatted_classes))
         
-        return jsonify(formatted_classes)
+        return Response(_classes_body[1], mimetype='application/json')
     except Exception as e:
         print(f"Error fetching Google Classroom classes: {e}")
         # Return sample data as fallback
@@ -116,109 +146,114 @@ def google_classroom_classes():
         ]
         return jsonify(sample_classes)
 
+# Seconds the public table list is reused before information_schema is queried again
+TABLES_CACHE_TTL = 300
+
+_Q_PUBLIC_TABLES = """
+    SELECT table_name as name FROM information_schema.tables 
+    WHERE table_schema = 'public' AND table_type = 'BASE TABLE'
+"""
+
+_Q_TABLE_SCHEMA = """
+    SELECT 
+        column_name as name,
+        ordinal_position as cid,
+        data_type as type,
+        is_nullable as notnull,
+        column_default as dflt_value,
+        CASE 
+            WHEN constraint_type = 'PRIMARY KEY' THEN 1 
+            ELSE 0 
+        END as pk
+    FROM 
+        information_schema.columns
+    LEFT JOIN 
+        information_schema.key_column_usage USING (column_name, table_name)
+    LEFT JOIN 
+        information_schema.table_constraints USING (constraint_name)
+    WHERE 
+        table_name = %s
+    ORDER BY 
+        ordinal_position
+"""
+
+# (loaded_at, rows, names) for the public table list
+_tables_cache = None
+_tables_lock = threading.Lock()
+
+def _public_tables():
+    """Return the public base tables as (rows, names), re-querying at most every TABLES_CACHE_TTL seconds."""
+    global _tables_cache
+    with _tables_lock:
+        if _tables_cache is None or time.monotonic() - _tables_cache[0] >= TABLES_CACHE_TTL:
+            rows = db.execute_query(_Q_PUBLIC_TABLES)
+            _tables_cache = (time.monotonic(), rows, frozenset(row['name'] for row in rows))
+        return _tables_cache[1], _tables_cache[2]
+
 @app.route('/api/database/tables', methods=['GET'])
 def get_database_tables():
     """Get a list of all tables in the database."""
-    try:
-        # Query to get all table names from PostgreSQL information schema
-        tables = db.execute_query("""
-            SELECT table_name as name FROM information_schema.tables 
-            WHERE table_schema = 'public' AND table_type = 'BASE TABLE'
-        """)
-        return jsonify(tables)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return jsonify(_public_tables()[0])
 
 @app.route('/api/database/table/<table_name>', methods=['GET'])
 def get_table_data(table_name):
     """Get all data from a specific table."""
-    try:
-        # Validate table name to prevent SQL injection
-        valid_tables = [table['name'] for table in db.execute_query("""
-            SELECT table_name as name FROM information_schema.tables 
-            WHERE table_schema = 'public' AND table_type = 'BASE TABLE'
-        """)]
-        
-        if table_name not in valid_tables:
-            return jsonify({'error': f'Invalid table name: {table_name}'}), 400
-        
-        # Get table data
-        data = db.execute_query(f"SELECT * FROM {table_name}")
-        
-        # Get table schema
-        schema = db.execute_query(f"""
-            SELECT 
-                column_name as name,
-                ordinal_position as cid,
-                data_type as type,
-                is_nullable as notnull,
-                column_default as dflt_value,
-                CASE 
-                    WHEN constraint_type = 'PRIMARY KEY' THEN 1 
-                    ELSE 0 
-                END as pk
-            FROM 
-                information_schema.columns
-            LEFT JOIN 
-                information_schema.key_column_usage USING (column_name, table_name)
-            LEFT JOIN 
-                information_schema.table_constraints USING (constraint_name)
-            WHERE 
-                table_name = %s
-            ORDER BY 
-                ordinal_position
-        """, (table_name,))
-        
-        return jsonify({
-            'data': data,
-            'schema': schema
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # Validate table name to prevent SQL injection
+    if table_name not in _public_tables()[1]:
+        return jsonify({'error': f'Invalid table name: {table_name}'}), 400
+    
+    # Get table schema
+    schema = db.execute_query(_Q_TABLE_SCHEMA, (table_name,), prepare=True)
+    
+    # Stream the rows, so large tables are never held in memory as a whole
+    return Response(_table_json_stream(table_name, schema), mimetype='application/json')
+
+def _table_json_stream(table_name, schema):
+    """Yield {"schema": [...], "data": [...]} as JSON, encoding the rows as they are read."""
+    # Same value conversions (dates, decimals, ...) and key order as jsonify
+    dumpb = app.json.dumpb
+    yield b'{"schema":' + dumpb(schema) + b',"data":['
+    separator = b''
+    for row in db.stream_query(f"SELECT * FROM {table_name}"):
+        yield separator + dumpb(row)
+        separator = b','
+    yield b']}'
 
 @app.route('/api/classroom/invite-student', methods=['POST'])
 def invite_single_student():
     """Invite a single student to a Google Classroom course."""
-    try:
-        data = request.json
-        
-        # Validate required fields
-        if not all(key in data for key in ['course_id', 'email']):
-            return jsonify({'error': 'Missing required fields: course_id, email'}), 400
-        
-        result = classroom_handler.invite_student(data['course_id'], data['email'])
-        
-        if result['success']:
-            return jsonify(result)
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    
+    # Validate required fields
+    if not all(key in data for key in ['course_id', 'email']):
+        return jsonify({'error': 'Missing required fields: course_id, email'}), 400
+    
+    result = classroom_handler.invite_student(data['course_id'], data['email'])
+    
+    if result['success']:
+        return jsonify(result)
+    else:
+        return jsonify(result), 400
 
 @app.route('/api/classroom/invite-multiple', methods=['POST'])
 def invite_multiple_students():
     """Invite multiple students to Google Classroom courses."""
-    try:
-        data = request.json
-        
-        # Validate that students data is provided
-        if 'students' not in data or not isinstance(data['students'], list):
-            return jsonify({'error': 'Missing or invalid students data'}), 400
-        
-        result = classroom_handler.invite_multiple_students(data['students'])
-        
-        return jsonify(result)
-            
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    
+    # Validate that students data is provided
+    if 'students' not in data or not isinstance(data['students'], list):
+        return jsonify({'error': 'Missing or invalid students data'}), 400
+    
+    result = classroom_handler.invite_multiple_students(data['students'])
+    
+    return jsonify(result)
 
 @app.route('/api/classroom/langgraph-agent', methods=['POST'])
 def run_langgraph_agent():
     """Run the LangGraph agent to process students from JSON and invite them to courses."""
     try:
         # Optional: accept custom JSON file path
-        data = request.json or {}
+        data = request.get_json() or {}
         json_file_path = data.get('json_file_path', None)
         
         # Create and run the agent
@@ -241,36 +276,22 @@ def run_langgraph_agent():
 @app.route('/api/classroom/students', methods=['GET'])
 def get_students_data():
     """Get the current students data from the JSON file."""
-    try:
-        students_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'students.json')
-        
-        if not os.path.exists(students_file):
-            return jsonify({'error': 'Students data file not found'}), 404
-        
-        with open(students_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    if not os.path.exists(STUDENTS_PATH):
+        return jsonify({'error': 'Students data file not found'}), 404
+    
+    return _load_cached(STUDENTS_PATH)
 
 @app.route('/api/classroom/students', methods=['POST'])
 def update_students_data():
     """Update the students data in the JSON file."""
-    try:
-        data = request.json
-        
-        if 'students' not in data:
-            return jsonify({'error': 'Missing students data'}), 400
-        
-        students_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'students.json')
-        
-        with open(students_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-        
-        return jsonify({'success': True, 'message': 'Students data updated successfully'})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    
+    if 'students' not in data:
+        return jsonify({'error': 'Missing students data'}), 400
+    
+    _write_cached(STUDENTS_PATH, data)
+    
+    return jsonify({'success': True, 'message': 'Students data updated successfully'})
 
 if __name__ == '__main__':
     app.run(debug=FLASK_DEBUG, host=FLASK_HOST, port=FLASK_PORT)
\ No newline at end of file
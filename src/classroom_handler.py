@@ -7,10 +7,20 @@ This module provides functions to interact with the Google Classroom API.
 import os
 import yaml
 import json
+import time
+import asyncio
+import queue
+import functools
+import threading
+import contextlib
+import weakref
+import httpx
+import httplib2
 from google.oauth2 import service_account
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import pickle
@@ -23,6 +33,79 @@ SCOPES = [
     'https://www.googleapis.com/auth/classroom.rosters.readonly'
 ]
 
+CLASSROOM_API_URL = 'https://classroom.googleapis.com/v1'
+
+# Partial-response mask covering the course fields used by the app
+COURSE_FIELDS = 'nextPageToken,courses(id,name,section,description,courseState,alternateLink,teacherFolder/title)'
+
+# Seconds a course listing is reused before the Classroom API is queried again
+COURSES_CACHE_TTL = 60
+
+# Socket timeout and keep-alive pool size for Classroom API connections
+CLASSROOM_HTTP_TIMEOUT = 10
+CLASSROOM_MAX_KEEPALIVE = 16
+
+def _auth_identity():
+    """Return a key identifying which account the Classroom API is accessed as."""
+    return (os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"), os.getenv("CLASSROOM_TEACHER_EMAIL"))
+
+def _ttl_cache(ttl):
+    """
+    Cache a course-listing function's non-empty results per auth identity for ttl seconds.
+    Concurrent misses share one call to the API instead of each making their own.
+    The wrapped function gains a cache_clear() method.
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+        refresh_lock = threading.Lock()
+        # In-flight async refreshes, per event loop: loop -> {identity: task}
+        inflight = weakref.WeakKeyDictionary()
+        
+        def lookup():
+            key = _auth_identity()
+            with lock:
+                entry = cache.get(key)
+            if entry and time.monotonic() - entry[0] < ttl:
+                return key, entry[1]
+            return key, None
+        
+        def store(key, result):
+            if result:
+                with lock:
+                    cache[key] = (time.monotonic(), result)
+            return result
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key, result = lookup()
+                if result is not None:
+                    return result
+                pending = inflight.setdefault(asyncio.get_running_loop(), {})
+                task = pending.get(key)
+                if task is None:
+                    task = pending[key] = asyncio.ensure_future(func(*args, **kwargs))
+                    task.add_done_callback(lambda _: pending.pop(key, None))
+                # Shielded so one cancelled caller does not cancel the shared refresh
+                return store(key, await asyncio.shield(task))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key, result = lookup()
+                if result is not None:
+                    return result
+                with refresh_lock:
+                    # Another thread may have refreshed while this one waited
+                    key, result = lookup()
+                    if result is not None:
+                        return result
+                    return store(key, func(*args, **kwargs))
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
 def load_config():
     """
     Load configuration from config.yml.
@@ -90,21 +173,81 @@ def get_credentials():
     
     return creds
 
+# Credentials shared by every connection in this process; get_credentials
+# re-reads and rewrites token.pickle, so it runs once rather than per request
+_shared_creds = None
+_shared_creds_lock = threading.Lock()
+
+def get_shared_credentials():
+    """
+    Return this process's credentials, refreshing them only when they are no longer valid.
+    Returns None without credentials.
+    """
+    global _shared_creds
+    with _shared_creds_lock:
+        if _shared_creds is None:
+            _shared_creds = get_credentials()
+        if _shared_creds and not _shared_creds.valid:
+            _shared_creds.refresh(Request())
+        return _shared_creds
+
+_service = None
+_service_lock = threading.Lock()
+
 def get_classroom_service():
     """
-    Create and return a Google Classroom service object.
+    Return the shared Google Classroom service object, creating it on first use.
     """
-    creds = get_credentials()
-    if not creds:
-        return None
+    global _service
+    if _service is not None:
+        return _service
     
+    with _service_lock:
+        if _service is None:
+            creds = get_shared_credentials()
+            if not creds:
+                return None
+            
+            try:
+                # The bundled discovery document avoids a network fetch. Requests
+                # execute on a classroom_http() connection: httplib2 connections
+                # must not be shared across threads or greenlets
+                http = AuthorizedHttp(creds, http=httplib2.Http(timeout=CLASSROOM_HTTP_TIMEOUT))
+                _service = build('classroom', 'v1', http=http,
+                                 cache_discovery=False, static_discovery=True)
+            except Exception as e:
+                print(f"Error building classroom service: {e}")
+                return None
+    return _service
+
+# Idle authorized connections. httplib2 connections are not safe to share
+# between threads or greenlets, so each call checks one out; up to
+# CLASSROOM_MAX_KEEPALIVE are kept open between calls for reuse.
+_idle_http = queue.LifoQueue(maxsize=CLASSROOM_MAX_KEEPALIVE)
+
+@contextlib.contextmanager
+def classroom_http():
+    """
+    Check out an authorized keep-alive HTTP connection, or None without credentials.
+    
+    Pass it to request.execute(http=...) on every call made through the shared service.
+    """
     try:
-        service = build('classroom', 'v1', credentials=creds)
-        return service
-    except Exception as e:
-        print(f"Error building classroom service: {e}")
-        return None
+        http = _idle_http.get_nowait()
+    except queue.Empty:
+        creds = get_shared_credentials()
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=CLASSROOM_HTTP_TIMEOUT)) if creds else None
+    
+    try:
+        yield http
+    finally:
+        if http is not None:
+            try:
+                _idle_http.put_nowait(http)
+            except queue.Full:
+                http.http.close()
 
+@_ttl_cache(COURSES_CACHE_TTL)
 def list_courses():
     """
     List all Google Classroom courses available to the authenticated user.
@@ -116,13 +259,99 @@ def list_courses():
     
     try:
         # Call the Classroom API
-        results = service.courses().list().execute()
+        with classroom_http() as http:
+            results = service.courses().list().execute(http=http)
         courses = results.get('courses', [])
         return courses
     except HttpError as error:
         print(f"An error occurred: {error}")
         return []
 
+def new_async_client():
+    """
+    Create a pooled Classroom API client.
+    
+    The client is bound to the running event loop; use it as an async context
+    manager so its connections are closed before the loop ends, and pass it to
+    the *_async functions to share it across a batch of calls.
+    """
+    return httpx.AsyncClient(
+        base_url=CLASSROOM_API_URL,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=CLASSROOM_MAX_KEEPALIVE)
+    )
+
+@contextlib.asynccontextmanager
+async def _async_client(client=None):
+    """Yield client, or a new client that is closed on exit when none is given."""
+    if client is not None:
+        yield client
+    else:
+        async with new_async_client() as client:
+            yield client
+
+async def _async_auth_headers():
+    """
+    Return Authorization headers for direct Classroom REST calls, or None without credentials.
+    """
+    creds = await asyncio.to_thread(get_shared_credentials)
+    if not creds:
+        return None
+    return {'Authorization': f'Bearer {creds.token}'}
+
+@_ttl_cache(COURSES_CACHE_TTL)
+async def list_courses_async(page_size=100, client=None):
+    """
+    Asynchronously list all Google Classroom courses available to the authenticated user.
+    Only the fields in COURSE_FIELDS are requested from the API.
+    Uses client (see new_async_client) when given, otherwise a client of its own.
+    Returns a list of course objects.
+    """
+    headers = await _async_auth_headers()
+    if not headers:
+        return []
+    
+    courses = []
+    params = {'fields': COURSE_FIELDS, 'pageSize': page_size}
+    
+    try:
+        async with _async_client(client) as client:
+            while True:
+                response = await client.get('/courses', params=params, headers=headers)
+                response.raise_for_status()
+                results = response.json()
+                courses.extend(results.get('courses', []))
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
+                params['pageToken'] = page_token
+        return courses
+    except httpx.HTTPError as error:
+        print(f"An error occurred: {error}")
+        return []
+
+async def create_course_work_async(course_id, body, client=None):
+    """
+    Asynchronously create a courseWork item in a course.
+    Uses client (see new_async_client) when given, otherwise a client of its own.
+    Returns the created courseWork resource; raises httpx.HTTPError on failure.
+    """
+    headers = await _async_auth_headers()
+    if not headers:
+        raise RuntimeError("Failed to connect to Google Classroom service")
+    
+    async with _async_client(client) as client:
+        response = await client.post(f'/courses/{course_id}/courseWork', json=body, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+def clear_courses_cache():
+    """
+    Drop cached course listings so the next call queries the Classroom API.
+    """
+    list_courses.cache_clear()
+    list_courses_async.cache_clear()
+
 def get_courses_count():
     """
     Get the number of Google Classroom courses.
@@ -168,7 +397,8 @@ def get_course_details(course_id):
         return None
     
     try:
-        course = service.courses().get(id=course_id).execute()
+        with classroom_http() as http:
+            course = service.courses().get(id=course_id).execute(http=http)
         return course
     except HttpError as error:
         print(f"An error occurred: {error}")
@@ -196,7 +426,8 @@ def invite_student(course_id, student_email):
             'role': 'STUDENT'
         }
         
-        invitation = service.invitations().create(body=invitation_body).execute()
+        with classroom_http() as http:
+            invitation = service.invitations().create(body=invitation_body).execute(http=http)
         
         return {
             "success": True,
@@ -340,10 +571,11 @@ def create_quiz_assignment(course_id, quiz_data, due_date=None):
                 print(f"Warning: Invalid due date format: {date_error}")
         
         # Create the assignment
-        assignment = service.courses().courseWork().create(
-            courseId=course_id,
-            body=assignment_body
-        ).execute()
+        with classroom_http() as http:
+            assignment = service.courses().courseWork().create(
+                courseId=course_id,
+                body=assignment_body
+            ).execute(http=http)
         
         return {
             "success": True,
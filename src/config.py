@@ -16,3 +16,6 @@ POSTGRES_CONFIG = {
 FLASK_DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
 FLASK_HOST = os.environ.get('FLASK_HOST', '0.0.0.0')
 FLASK_PORT = int(os.environ.get('FLASK_PORT', '5000'))
+
+# Quiz generation: run generate_quiz.py in a subprocess instead of in-process
+QUIZ_SUBPROCESS = os.environ.get('QUIZ_SUBPROCESS', 'False').lower() == 'true'
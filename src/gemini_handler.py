@@ -5,16 +5,88 @@ This module handles all interactions with the Gemini API for the edu-app.
 """
 
 import os
-import json
+import orjson
 import time
-import yaml
-from typing import TypedDict, Literal, Dict
+import asyncio
+import weakref
+import functools
+import threading
+import contextlib
+from typing import TypedDict, Literal, Dict, List
 
-import google.generativeai as genai
-from langgraph.graph import StateGraph, END
+# google.generativeai (gRPC/protobuf) and langgraph are imported where they
+# are first needed, so importing this module stays cheap for callers that
+# never reach Gemini
 
 # ─────────────────────────── Configuration ────────────────────────────
 MODEL_NAME = "gemini-2.5-flash"  
+GEMINI_RPM = 60  # request quota per minute
+GEMINI_MAX_CONCURRENCY = 8  # in-flight requests for async fan-out
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    """Configure the Gemini SDK and build the model once per process."""
+    import yaml
+    import google.generativeai as genai
+    
+    with open("config.yml", "r") as file:
+        config = yaml.safe_load(file)
+    
+    genai.configure(api_key=config["google_ai_studio_api_key"])
+    return genai.GenerativeModel(MODEL_NAME)
+
+class _RateLimiter:
+    """Space calls evenly under a per-minute quota, sleeping only when they arrive too fast."""
+    
+    def __init__(self, rpm: int):
+        self.interval = 60.0 / rpm
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Claim the next call slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        return delay
+    
+    def wait(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def await_slot(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+_rate_limiter = _RateLimiter(GEMINI_RPM)
+
+# Semaphores are bound to the event loop that created them
+_semaphores = weakref.WeakKeyDictionary()
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Return the concurrency limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    return semaphore
+
+def acquire_slot():
+    """Block until the shared Gemini quota allows another call; use before every blocking Gemini request."""
+    _rate_limiter.wait()
+
+@contextlib.asynccontextmanager
+async def async_slot():
+    """
+    Hold one of the running loop's GEMINI_MAX_CONCURRENCY slots, after waiting
+    for the shared quota; wrap every async Gemini request in it.
+    """
+    async with _get_semaphore():
+        await _rate_limiter.await_slot()
+        yield
 
 # ─────────────────────────── Graph state type ─────────────────────────
 class State(TypedDict):
@@ -24,52 +96,101 @@ class State(TypedDict):
     coursework_payload: Dict  # gets filled by Gemini
     response: Dict  # API response goes here
 
+# ──────────────────── Gemini JSON-mode response schemas ────────────────
+_DUE_DATE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "year": {"type": "INTEGER"},
+        "month": {"type": "INTEGER"},
+        "day": {"type": "INTEGER"},
+    },
+    "required": ["year", "month", "day"],
+}
+
+# workType and state are fixed per request, so they are filled in by
+# generate_node rather than asked of the model
+COURSEWORK_SCHEMAS = {
+    "ASSIGNMENT": {
+        "type": "OBJECT",
+        "properties": {
+            "title": {"type": "STRING"},
+            "description": {"type": "STRING"},
+            "maxPoints": {"type": "INTEGER"},
+            "dueDate": _DUE_DATE_SCHEMA,
+        },
+        "required": ["title", "description", "maxPoints", "dueDate"],
+    },
+    "MULTIPLE_CHOICE_QUESTION": {
+        "type": "OBJECT",
+        "properties": {
+            "title": {"type": "STRING"},
+            "description": {"type": "STRING"},
+            "multipleChoiceQuestion": {
+                "type": "OBJECT",
+                "properties": {
+                    "choices": {"type": "ARRAY", "items": {"type": "STRING"}},
+                },
+                "required": ["choices"],
+            },
+            "maxPoints": {"type": "INTEGER"},
+        },
+        "required": ["title", "description", "multipleChoiceQuestion", "maxPoints"],
+    },
+}
+
+_GENERATION_CONFIGS = {
+    work_type: {"response_mime_type": "application/json", "response_schema": schema}
+    for work_type, schema in COURSEWORK_SCHEMAS.items()
+}
+
 # ─────────────────────── Gemini prompt builders ───────────────────────
+_PROMPT_TEMPLATES = {
+    "ASSIGNMENT": 'Generate a Google Classroom assignment about: "{topic}".',
+    "MULTIPLE_CHOICE_QUESTION": 'Generate a Google Classroom multiple‑choice quiz with three choices about: "{topic}".',
+}
+
 def _prompt(topic: str, work_type: str) -> str:
     """Build a prompt for Gemini based on the work type."""
-    if work_type == "ASSIGNMENT":
-        return f"""
-Return ONLY valid JSON for a Google Classroom assignment.
-Keys (exactly):
-  "title"         : str
-  "description"   : str
-  "maxPoints"     : int
-  "dueDate"       : {{ "year": int, "month": int, "day": int }}
-  "workType"      : "ASSIGNMENT"
-  "state"         : "PUBLISHED"
-
-Generate an assignment about: "{topic}".
-"""
-    return f"""
-Return ONLY valid JSON for a Google Classroom multiple‑choice quiz.
-Keys (exactly):
-  "title"                  : str
-  "description"            : str
-  "multipleChoiceQuestion" : {{ "choices": [str, str, str] }}
-  "maxPoints"              : int
-  "workType"               : "MULTIPLE_CHOICE_QUESTION"
-  "state"                  : "PUBLISHED"
-
-Generate a quiz about: "{topic}".
-"""
+    return _PROMPT_TEMPLATES[work_type].format_map({"topic": topic})
 
 # ────────────────────────── LangGraph nodes ───────────────────────────
+def _coursework_payload(text: str, work_type: str) -> Dict:
+    """Decode a JSON-mode reply and add the fields fixed by the request."""
+    payload = orjson.loads(text)
+    payload["workType"] = work_type
+    payload["state"] = "PUBLISHED"
+    return payload
+
 def generate_node(state: State) -> State:
     """Generate content using Gemini API based on the topic and work type."""
-    with open("config.yml", "r") as file:
-        config = yaml.safe_load(file)
-    
-    genai.configure(api_key=config["google_ai_studio_api_key"])
     prompt = _prompt(state["topic"], state["work_type"])
-    model = genai.GenerativeModel(MODEL_NAME)
-    time.sleep(1)  # mild rate‑limit buffer
-    resp = model.generate_content(prompt)
-    state["coursework_payload"] = json.loads(resp.text)
+    model = _get_model()
+    acquire_slot()
+    # JSON mode constrains the reply to the schema, so it always parses
+    resp = model.generate_content(prompt, generation_config=_GENERATION_CONFIGS[state["work_type"]])
+    state["coursework_payload"] = _coursework_payload(resp.text, state["work_type"])
+    return state
+
+async def agenerate_node(state: State) -> State:
+    """Async generate_node; concurrent calls share the quota and concurrency limits."""
+    prompt = _prompt(state["topic"], state["work_type"])
+    model = _get_model()
+    async with async_slot():
+        resp = await model.generate_content_async(
+            prompt, generation_config=_GENERATION_CONFIGS[state["work_type"]]
+        )
+    state["coursework_payload"] = _coursework_payload(resp.text, state["work_type"])
     return state
 
+async def agenerate_many(states: List[State]) -> List[State]:
+    """Generate payloads for several topics concurrently, in input order."""
+    return await asyncio.gather(*(agenerate_node(state) for state in states))
+
 # ───────────────────────── Build the graph ────────────────────────────
 def build_graph():
     """Build and return a compiled LangGraph for the Gemini workflow."""
+    from langgraph.graph import StateGraph, END
+    
     g = StateGraph(State)
     g.add_node("generate", generate_node)
     g.add_node("create", None)  # This will be set in main.py
@@ -78,8 +199,13 @@ def build_graph():
     g.set_entry_point("generate")
     return g
 
+@functools.lru_cache(maxsize=None)
 def get_compiled_graph(create_function):
-    """Get a compiled graph with the create function set."""
+    """Get a compiled graph with the create function set.
+    
+    The compiled graph is cached per create function, so pass a module-level
+    function rather than a fresh lambda or closure on each call.
+    """
     g = build_graph()
     g.set_node("create", create_function)
     return g.compile()
@@ -5,9 +5,16 @@ This script reads lesson_plan.json and generates a quiz.json file.
 """
 
 import os
+import sys
 import json
 import yaml
 import google.generativeai as genai
+from pathlib import Path
+
+# Allow running as a script (QUIZ_SUBPROCESS) as well as importing as src.generate_quiz
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.gemini_handler import acquire_slot, async_slot
 
 # Paths
 LESSON_PLAN_PATH = os.path.join(os.path.dirname(__file__), 'data', 'lesson_plan.json')
@@ -48,17 +55,26 @@ def load_lesson_plan():
             "number_of_questions": 1
         }
 
-def generate_quiz_with_gemini(lesson_plan):
-    """Generate a quiz using Gemini API based on the lesson plan or content."""
-    api_key = get_gemini_api_key()
-    if not api_key:
-        print("No Gemini API key found. Using fallback quiz generation.")
-        return generate_fallback_quiz(lesson_plan)
-    
-    # Configure the Gemini API
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-1.5-pro')
+_model = None
+
+def _get_model():
+    """
+    Return the shared Gemini model, configuring the API on first use; None without an API key.
     
+    Callers in a long-running process (the backends, chatbot tools) then skip
+    re-reading config.yml and rebuilding the client on every quiz.
+    """
+    global _model
+    if _model is None:
+        api_key = get_gemini_api_key()
+        if not api_key:
+            return None
+        genai.configure(api_key=api_key)
+        _model = genai.GenerativeModel('gemini-1.5-pro')
+    return _model
+
+def _quiz_prompt(lesson_plan):
+    """Build the Gemini prompt for a lesson plan, from its content when it has any."""
     topic = lesson_plan.get('topic', 'General Knowledge')
     num_questions = int(lesson_plan.get('number_of_questions', 1))
     response_type = lesson_plan.get('response_type', 'multiple_choice_question')
@@ -121,26 +137,59 @@ def generate_quiz_with_gemini(lesson_plan):
         
         IMPORTANT: Make sure your response is valid JSON that can be parsed.
         """
+    return prompt
+
+def _parse_quiz(response_text, lesson_plan, log):
+    """Extract the quiz JSON from a Gemini reply, or fall back when there is none."""
+    # Find JSON content (between curly braces)
+    start_idx = response_text.find('{')
+    end_idx = response_text.rfind('}') + 1
+    
+    if start_idx >= 0 and end_idx > start_idx:
+        json_str = response_text[start_idx:end_idx]
+        return json.loads(json_str)
+    
+    log("Could not extract JSON from Gemini response")
+    return generate_fallback_quiz(lesson_plan)
+
+def generate_quiz_with_gemini(lesson_plan, log=print):
+    """
+    Generate a quiz using Gemini API based on the lesson plan or content.
+    
+    Progress and error messages go to log (print by default); servers pass
+    a per-request collector instead of redirecting the process's stdout.
+    """
+    model = _get_model()
+    if model is None:
+        log("No Gemini API key found. Using fallback quiz generation.")
+        return generate_fallback_quiz(lesson_plan)
     
     try:
-        response = model.generate_content(prompt)
-        # Extract JSON from the response
-        response_text = response.text
-        
-        # Find JSON content (between curly braces)
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        
-        if start_idx >= 0 and end_idx > start_idx:
-            json_str = response_text[start_idx:end_idx]
-            quiz_data = json.loads(json_str)
-            return quiz_data
-        else:
-            print("Could not extract JSON from Gemini response")
-            return generate_fallback_quiz(lesson_plan)
+        acquire_slot()  # Shared Gemini quota (same as gemini_handler)
+        response = model.generate_content(_quiz_prompt(lesson_plan))
+        return _parse_quiz(response.text, lesson_plan, log)
     
     except Exception as e:
-        print(f"Error generating quiz with Gemini: {e}")
+        log(f"Error generating quiz with Gemini: {e}")
+        return generate_fallback_quiz(lesson_plan)
+
+async def generate_quiz_with_gemini_async(lesson_plan, log=print):
+    """
+    Async generate_quiz_with_gemini; concurrent calls share gemini_handler's
+    quota and concurrency limits.
+    """
+    model = _get_model()
+    if model is None:
+        log("No Gemini API key found. Using fallback quiz generation.")
+        return generate_fallback_quiz(lesson_plan)
+    
+    try:
+        async with async_slot():
+            response = await model.generate_content_async(_quiz_prompt(lesson_plan))
+        return _parse_quiz(response.text, lesson_plan, log)
+    
+    except Exception as e:
+        log(f"Error generating quiz with Gemini: {e}")
         return generate_fallback_quiz(lesson_plan)
 
 def generate_fallback_quiz(lesson_plan):
@@ -188,7 +237,7 @@ def save_quiz(quiz_data):
         return False
 
 def main():
-    """Main function to generate and save a quiz."""
+    """Main function to generate and save a quiz; returns the quiz data."""
     print("Loading lesson plan...")
     lesson_plan = load_lesson_plan()
     
@@ -202,6 +251,8 @@ def main():
         print("Quiz generation completed successfully!")
     else:
         print("Quiz generation failed.")
+    
+    return quiz_data
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
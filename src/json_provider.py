@@ -0,0 +1,36 @@
+"""
+orjson-backed JSON provider for the Flask apps.
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes and decodes with orjson.
+
+    Installed with ``app.json = ORJSONProvider(app)``; ``jsonify`` and
+    ``request.get_json()`` then go through orjson. Output matches
+    DefaultJSONProvider's: dates stay RFC 822 strings, non-str keys are
+    converted, and ``sort_keys``/``compact`` are honoured. Non-ASCII text
+    is written as UTF-8 rather than escaped.
+    """
+
+    def _options(self, kwargs):
+        # Dates are passed through to ``default`` so they keep Flask's format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumpb(self, obj, **kwargs):
+        """Serialize obj to JSON bytes, with the same options as dumps."""
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=self._options(kwargs))
+
+    def dumps(self, obj, **kwargs):
+        return self.dumpb(obj, **kwargs).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
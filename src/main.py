@@ -18,16 +18,16 @@ Optional:
   export GOOGLE_AI_STUDIO_API_KEY=<your‑Gemini‑key>
 """
 
-import os, json, yaml
+import os, json
+import asyncio
+import functools
 from typing import Dict
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-
-# Import the gemini handler module
+# Import the gemini handler module (its Gemini and LangGraph imports are deferred)
 import gemini_handler
-# Import the classroom handler module
-import classroom_handler
+
+# yaml, the Google API client and classroom_handler are imported where they
+# are used, so --help and argument errors return without loading them
 
 # ─────────────────────────── Configuration ────────────────────────────
 SCOPES = ["https://www.googleapis.com/auth/classroom.coursework.students"]
@@ -36,6 +36,8 @@ def load_config():
     """
     Load configuration from config.yml.
     """
+    import yaml
+    
     try:
         with open("config.yml", "r") as file:
             return yaml.safe_load(file)
@@ -43,8 +45,15 @@ def load_config():
         print(f"Error loading config.yml: {e}")
         return None
 
-def create_node(state: gemini_handler.State) -> gemini_handler.State:
-    """Create a Google Classroom coursework item using the generated content."""
+@functools.lru_cache(maxsize=1)
+def _classroom_service():
+    """Build the service-account Classroom client once per process.
+    
+    The bundled discovery document is used, so building it needs no network fetch.
+    """
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+    
     creds = service_account.Credentials.from_service_account_file(
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"], scopes=SCOPES
     )
@@ -52,9 +61,12 @@ def create_node(state: gemini_handler.State) -> gemini_handler.State:
     if subj:
         creds = creds.with_subject(subj)
 
-    service = build("classroom", "v1", credentials=creds)
+    return build("classroom", "v1", credentials=creds, cache_discovery=False, static_discovery=True)
+
+def create_node(state: gemini_handler.State) -> gemini_handler.State:
+    """Create a Google Classroom coursework item using the generated content."""
     cw = (
-        service.courses()
+        _classroom_service().courses()
         .courseWork()
         .create(courseId=state["course_id"], body=state["coursework_payload"])
         .execute()
@@ -66,14 +78,6 @@ def create_node(state: gemini_handler.State) -> gemini_handler.State:
 if __name__ == "__main__":
     import argparse, textwrap
 
-    # Load configuration
-    config = load_config()
-    if config and 'google_classroom_api_key' in config:
-        print(f"Google Classroom API key found in config.yml")
-    
-    # Display courses and count using the classroom_handler
-    classroom_handler.display_courses()
-    
     parser = argparse.ArgumentParser(
         description="Create Classroom coursework via Gemini + LangGraph",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -88,18 +92,40 @@ if __name__ == "__main__":
         """)
     )
     parser.add_argument("--course", required=True, help="Target Classroom courseId")
-    parser.add_argument("--topic",  required=True, help="Short topic description")
+    parser.add_argument("--topic",  required=True, nargs="+",
+                        help="Short topic description; several topics are generated concurrently")
     parser.add_argument("--type",   choices=["assignment", "quiz"], default="assignment")
     args = parser.parse_args()
 
-    # Get the compiled graph with our create_node function
-    graph = gemini_handler.get_compiled_graph(create_node)
+    import classroom_handler
+
+    # Load configuration
+    config = load_config()
+    if config and 'google_classroom_api_key' in config:
+        print(f"Google Classroom API key found in config.yml")
+    
+    # Display courses and count using the classroom_handler
+    classroom_handler.display_courses()
+
+    work_type = "ASSIGNMENT" if args.type == "assignment" else "MULTIPLE_CHOICE_QUESTION"
+    states = [
+        {
+            "topic": topic,
+            "work_type": work_type,
+            "course_id": args.course,
+            "coursework_payload": {},
+            "response": {}
+        }
+        for topic in args.topic
+    ]
+    
+    if len(states) == 1:
+        # Get the compiled graph with our create_node function
+        graph = gemini_handler.get_compiled_graph(create_node)
+        results = [graph.invoke(states[0])]
+    else:
+        # Overlap the Gemini calls, then create the coursework items in order
+        results = [create_node(state) for state in asyncio.run(gemini_handler.agenerate_many(states))]
     
-    result = graph.invoke({
-        "topic": args.topic,
-        "work_type": "ASSIGNMENT" if args.type == "assignment" else "MULTIPLE_CHOICE_QUESTION",
-        "course_id": args.course,
-        "coursework_payload": {},
-        "response": {}
-    })
-    print(json.dumps(result["response"], indent=2))
+    for result in results:
+        print(json.dumps(result["response"], indent=2))
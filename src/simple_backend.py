@@ -4,20 +4,28 @@ Simplified backend server for the edu-app frontend.
 Uses Google Classroom API directly without database dependencies.
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
+import asyncio
 import json
+import orjson
 import os
 import sys
 from pathlib import Path
 from werkzeug.utils import secure_filename
 import tempfile
+import threading
 import uuid
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+from src import classroom_handler
+from src.generate_quiz import generate_quiz_with_gemini
+from src.json_provider import ORJSONProvider
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)  # Enable CORS for frontend
 
 # Global chatbot instances - now using LangGraph agent integration
@@ -29,13 +37,15 @@ chatbot_instances = {
 }
 current_chatbot_type = "langgraph_gemini"  # Default to LangGraph with Gemini
 
+# Serialized class list for the most recent course listing: (courses, body).
+# list_courses returns the same list object until its cache expires.
+_classes_body = (None, b'')
+
 @app.route('/api/google-classroom-classes', methods=['GET'])
 def get_google_classroom_classes():
     """Get Google Classroom classes using the API."""
+    global _classes_body
     try:
-        # Import classroom handler
-        import classroom_handler
-        
         # Get classes from Google Classroom API
         classes = classroom_handler.list_courses()
         
@@ -45,20 +55,23 @@ def get_google_classroom_classes():
                 "classes": []
             }), 200
         
-        # Format classes for frontend
-        formatted_classes = []
-        for cls in classes:
-            formatted_classes.append({
-                "id": cls.get("id", ""),
-                "name": cls.get("name", "Unnamed Class"),
-                "section": cls.get("section", ""),
-                "description": cls.get("description", ""),
-                "courseState": cls.get("courseState", "UNKNOWN"),
-                "link": cls.get("alternateLink", ""),
-                "teacherFolder": cls.get("teacherFolder", {}).get("title", "")
-            })
-        
-        return jsonify(formatted_classes)
+        if _classes_body[0] is not classes:
+            # Format classes for frontend
+            formatted_classes = [
+                {
+                    "id": cls.get("id", ""),
+                    "name": cls.get("name", "Unnamed Class"),
+                    "section": cls.get("section", ""),
+                    "description": cls.get("description", ""),
+                    "courseState": cls.get("courseState", "UNKNOWN"),
+                    "link": cls.get("alternateLink", ""),
+                    "teacherFolder": cls.get("teacherFolder", {}).get("title", "")
+                }
+                for cls in classes
+            ]
+            _classes_body = (classes, orjson.dumps(formatted_classes))
+        
+        return Response(_classes_body[1], mimetype='application/json')
         
     except Exception as e:
         print(f"Error fetching classes: {e}")
@@ -71,7 +84,7 @@ def get_google_classroom_classes():
 def upload_material_to_classroom():
     """Upload OCR-extracted material to Google Classroom."""
     try:
-        data = request.json
+        data = request.get_json()
         course_id = data.get('courseId')
         material_data = data.get('materialData')
         
@@ -99,7 +112,7 @@ def upload_material_to_classroom():
 def upload_quiz_to_classroom():
     """Upload OCR-generated quiz to Google Classroom."""
     try:
-        data = request.json
+        data = request.get_json()
         course_id = data.get('courseId')
         quiz_data = data.get('quizData')
         
@@ -123,21 +136,35 @@ def upload_quiz_to_classroom():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# OCR pipeline of this process, built on first use. Its tesseract engines
+# hold native state that must not be shared across fork(), so a pipeline
+# inherited from a preloading gunicorn master is replaced in each worker.
+_ocr_pipeline = None
+_ocr_pipeline_pid = None
+_ocr_pipeline_lock = threading.Lock()
+
+def _get_ocr_pipeline():
+    """Return this process's shared OCR pipeline."""
+    global _ocr_pipeline, _ocr_pipeline_pid
+    with _ocr_pipeline_lock:
+        if _ocr_pipeline is None or _ocr_pipeline_pid != os.getpid():
+            from ocr_module import OCRPipeline
+            _ocr_pipeline = OCRPipeline()
+            _ocr_pipeline_pid = os.getpid()
+        return _ocr_pipeline
+
 @app.route('/api/ocr/process', methods=['POST'])
 def process_ocr_image():
     """Process an image with OCR."""
     try:
-        data = request.json
+        data = request.get_json()
         image_path = data.get('imagePath')
         extraction_type = data.get('extractionType', 'educational_content')
         
         if not image_path:
             return jsonify({"error": "Missing imagePath"}), 400
         
-        # Import OCR pipeline
-        from ocr_module import OCRPipeline
-        
-        pipeline = OCRPipeline()
+        pipeline = _get_ocr_pipeline()
         result = pipeline.process_image(
             image_path=image_path,
             extraction_type=extraction_type,
@@ -182,10 +209,7 @@ def process_uploaded_image():
         file.save(str(file_path))
         
         try:
-            # Import and use OCR pipeline
-            from ocr_module import OCRPipeline
-            
-            pipeline = OCRPipeline()
+            pipeline = _get_ocr_pipeline()
             result = pipeline.process_image(
                 image_path=str(file_path),
                 extraction_type=extraction_type,
@@ -218,10 +242,6 @@ def process_uploaded_image():
 def generate_quiz_from_ocr(ocr_result):
     """Generate quiz from OCR result using generate_quiz.py functions."""
     try:
-        # Import the quiz generation functions
-        sys.path.append(str(Path(__file__).parent))
-        from generate_quiz import generate_quiz_with_gemini
-        
         # Extract text from OCR result
         ocr_text = ocr_result.get('ocr_result', {}).get('text', '')
         
@@ -310,19 +330,50 @@ def health_check():
     """Health check endpoint."""
     return jsonify({"status": "healthy", "message": "Simplified edu-app backend is running"})
 
+LESSON_PLAN_FILE = os.path.join("data", "lesson_plan.json")
+QUIZ_FILE = os.path.join("data", "quiz.json")
+
+# In-process cache of JSON data files: path -> (mtime_ns, size, data, body)
+_JSON_CACHE = {}
+
+def _read_cached(path):
+    """Return the cache entry for a data file, re-reading it only when it changes on disk; None if missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _JSON_CACHE.pop(path, None)
+        return None
+    entry = _JSON_CACHE.get(path)
+    if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+        with open(path, 'rb') as f:
+            body = f.read()
+        data = orjson.loads(body)
+        entry = (st.st_mtime_ns, st.st_size, data, body)
+        _JSON_CACHE[path] = entry
+    return entry
+
+def _write_cached(path, data):
+    """Atomically write data as JSON and refresh its cache entry."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    body = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    # Unique per writer, so concurrent POSTs never interleave into one temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    Path(tmp_path).write_bytes(body)
+    os.replace(tmp_path, path)
+    st = os.stat(path)
+    _JSON_CACHE[path] = (st.st_mtime_ns, st.st_size, data, body)
+
+def _cached_list_response(path):
+    """Return a data file wrapped in a one-element JSON array, or an empty array if it is missing."""
+    entry = _read_cached(path)
+    body = b"[" + entry[3] + b"]" if entry else b"[]"
+    return Response(body, mimetype='application/json')
+
 @app.route('/api/lesson-plans', methods=['GET'])
 def get_lesson_plans():
     """Get lesson plans from local data files."""
     try:
-        # Check if lesson plan file exists
-        lesson_file = Path("data/lesson_plan.json")
-        if lesson_file.exists():
-            with open(lesson_file, 'r') as f:
-                lesson_data = json.load(f)
-            return jsonify([lesson_data])  # Return as array for frontend compatibility
-        else:
-            return jsonify([])  # Empty array if no data
-            
+        return _cached_list_response(LESSON_PLAN_FILE)  # Array for frontend compatibility
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -330,15 +381,7 @@ def get_lesson_plans():
 def get_quizzes():
     """Get quizzes from local data files."""
     try:
-        # Check if quiz file exists
-        quiz_file = Path("data/quiz.json")
-        if quiz_file.exists():
-            with open(quiz_file, 'r') as f:
-                quiz_data = json.load(f)
-            return jsonify([quiz_data])  # Return as array for frontend compatibility
-        else:
-            return jsonify([])  # Empty array if no data
-            
+        return _cached_list_response(QUIZ_FILE)  # Array for frontend compatibility
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -346,12 +389,9 @@ def get_quizzes():
 def get_quiz():
     """Get single quiz from local data files."""
     try:
-        # Check if quiz file exists
-        quiz_file = Path("data/quiz.json")
-        if quiz_file.exists():
-            with open(quiz_file, 'r') as f:
-                quiz_data = json.load(f)
-            return jsonify(quiz_data)  # Return single object
+        entry = _read_cached(QUIZ_FILE)
+        if entry:
+            return Response(entry[3], mimetype='application/json')  # Return single object
         else:
             return jsonify({"error": "No quiz data found"}), 404
             
@@ -362,18 +402,12 @@ def get_quiz():
 def save_quiz():
     """Save quiz data to local file."""
     try:
-        quiz_data = request.json
+        quiz_data = request.get_json()
         if not quiz_data:
             return jsonify({"error": "No quiz data provided"}), 400
             
-        # Ensure data directory exists
-        data_dir = Path("data")
-        data_dir.mkdir(exist_ok=True)
-        
-        # Save to quiz file
-        quiz_file = data_dir / "quiz.json"
-        with open(quiz_file, 'w') as f:
-            json.dump(quiz_data, f, indent=2)
+        # Save to quiz file and refresh the cached copy
+        _write_cached(QUIZ_FILE, quiz_data)
         
         return jsonify({"message": "Quiz saved successfully"})
         
@@ -417,7 +451,7 @@ def get_chatbot_instance(chatbot_type: str = None):
 def send_chatbot_message():
     """Send a message to the chatbot and get a response."""
     try:
-        data = request.json
+        data = request.get_json()
         message = data.get('message')
         user_id = data.get('user_id', 'anonymous')
         chatbot_type = data.get('chatbot_type', current_chatbot_type)
@@ -441,11 +475,55 @@ def send_chatbot_message():
             "error": f"Chatbot error: {str(e)}"
         }), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def stream_chatbot_message():
+    """Send a message to the chatbot and stream the response as server-sent events."""
+    data = request.get_json() or {}
+    message = data.get('message')
+    user_id = data.get('user_id', 'anonymous')
+    chatbot_type = data.get('chatbot_type', current_chatbot_type)
+    
+    if not message:
+        return jsonify({"error": "No message provided"}), 400
+    
+    chatbot = get_chatbot_instance(chatbot_type)
+    if not chatbot:
+        return jsonify({
+            "success": False,
+            "error": f"{chatbot_type.title()} chatbot is not available. Please check API configuration."
+        }), 500
+    
+    def events():
+        # Chatbots without streaming support send the whole response as one event
+        if not hasattr(chatbot, 'send_message_stream'):
+            result = chatbot.send_message(message, user_id)
+            yield f"data: {json.dumps({'delta': result.get('response', '')})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+            return
+        
+        loop = asyncio.new_event_loop()
+        stream = chatbot.send_message_stream(message, user_id)
+        try:
+            while True:
+                try:
+                    delta = loop.run_until_complete(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': f'Chatbot error: {str(e)}'})}\n\n"
+        finally:
+            loop.run_until_complete(stream.aclose())
+            loop.close()
+    
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/chatbot/clear', methods=['POST'])
 def clear_chatbot_conversation():
     """Clear the chatbot conversation history."""
     try:
-        data = request.json if request.json else {}
+        data = request.get_json() or {}
         chatbot_type = data.get('chatbot_type', current_chatbot_type)
         
         chatbot = get_chatbot_instance(chatbot_type)
@@ -463,7 +541,7 @@ def switch_chatbot():
     """Switch between different chatbot models."""
     try:
         global current_chatbot_type
-        data = request.json
+        data = request.get_json()
         new_type = data.get('chatbot_type')
         
         valid_types = ['gemini', 'claude', 'langgraph_gemini', 'langgraph_claude']